@@ -1,7 +1,7 @@
 import os
 import logging
 import uuid
-from dotenv import load_dotenv
+from utils.env import load_env
 from langchain_google_genai import ChatGoogleGenerativeAI
 from contextvars import ContextVar
 from typing import Dict, Any, Optional
@@ -32,7 +32,7 @@ def set_session_id(session_id: str = None)-> str:
     session_id_var.set(session_id)
     logger.info(f"Session ID set to: {session_id}")
     return session_id
-load_dotenv()
+load_env()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
 
@@ -4,14 +4,14 @@ import uuid
 import tempfile
 import time
 import asyncio
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, Body
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, Body, BackgroundTasks, Query
 from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi import Request
 import mimetypes
 from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+from utils.env import load_env
 import logging
-import base64
 import io
 from datetime import datetime, timedelta
 from fastapi.responses import StreamingResponse
@@ -20,16 +20,25 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from auth.google_auth import verify_google_token, create_jwt_token, verify_jwt_token
 from database.patient_db import (
     create_patient,
+    create_patients_bulk,
+    plan_patients_bulk,
+    write_patients_bulk,
     get_all_patients,
+    get_patients_page,
     get_patient_by_id,
     save_soap_record,
     get_patient_soap_records,
+    get_patient_soap_records_summary,
+    get_patient_soap_records_page,
+    get_soap_record_by_id,
     get_voice_recordings,
     get_logged_user_by_google,
     create_logged_user,
     get_or_create_logged_user,
     create_user,
     get_user_by_email,
+    SOAP_SUMMARY_FIELDS,
+    MAX_PAGE_SIZE,
 )
 from utils.encryption import decrypt_text, encrypt_text, hash_password, verify_password
 from auth.middleware import get_current_user, optional_auth
@@ -37,23 +46,19 @@ from pipeline.core import MedicalAudioProcessor
 from agent.config import set_session_id, logger, GEMINI_API_KEY
 from agent.core import process_appointment
 from user.chat_service import process_user_question
-from database.patient_db import (
-    create_patient,
-    get_all_patients,
-    get_patient_by_id,
-    save_soap_record,
-    get_patient_soap_records,
-    get_voice_recordings,
-    get_logged_user_by_google,
-    create_logged_user,
-    get_or_create_logged_user,
-)
 # Import the availability flags to check if services are ready
-from database.cosmos_client import blob_service_client, db_available, blob_available, ensure_containers_exist
+from database.cosmos_client import (
+    get_blob_service_client,
+    get_blob_container_client,
+    db_ready,
+    is_db_available,
+    blob_available,
+    ensure_containers_exist,
+)
 
-from utils.encryption import decrypt_bytes
+from utils.encryption import decrypt_bytes_raw
 
-load_dotenv()
+load_env()
 
 # Suppress verbose Azure SDK logging
 logging.getLogger('azure.cosmos._cosmos_http_logging_policy').setLevel(logging.WARNING)
@@ -75,7 +80,22 @@ async def log_user_to_db_async(email: str, name: str = None):
         logger.info("Background: Logged user created/updated (PII omitted)")
     except Exception as e:
         logger.warning(f"Background: Failed to create logged user: {e}")
-        
+
+
+async def ensure_containers_async():
+    """Ensure Cosmos DB containers exist once the background DB init finishes, without blocking startup."""
+    loop = asyncio.get_running_loop()
+    if not await loop.run_in_executor(None, is_db_available):
+        logger.warning("⚠️ Cosmos DB not available, skipping container initialization")
+        return
+    try:
+        logger.info("📦 Ensuring Cosmos DB containers exist...")
+        await loop.run_in_executor(None, ensure_containers_exist)
+        logger.info("✅ Cosmos DB containers initialized successfully")
+    except Exception as e:
+        logger.error(f"❌ Failed to initialize Cosmos DB containers: {e}")
+        logger.warning("⚠️ App will continue but database operations may fail")
+
 
 
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'https://victorious-pond-00c76f410.3.azurestaticapps.net')
@@ -118,16 +138,7 @@ async def on_startup():
     logger.info(f"✅ Cookie settings: Secure={COOKIE_SECURE}, SameSite={COOKIE_SAMESITE}")
     
     # Initialize Cosmos DB containers if they don't exist
-    if db_available:
-        try:
-            logger.info("📦 Ensuring Cosmos DB containers exist...")
-            ensure_containers_exist()
-            logger.info("✅ Cosmos DB containers initialized successfully")
-        except Exception as e:
-            logger.error(f"❌ Failed to initialize Cosmos DB containers: {e}")
-            logger.warning("⚠️ App will continue but database operations may fail")
-    else:
-        logger.warning("⚠️ Cosmos DB not available, skipping container initialization")
+    asyncio.create_task(ensure_containers_async())
 
 
 @app.on_event("shutdown")
@@ -146,7 +157,7 @@ async def root():
     return {"message": "Medical Audio Processor Backend is running!"}
 
 @app.get("/health")
-async def health_check():
+def health_check():
     """Health check endpoint that tests database connectivity."""
     health_status = {
         "status": "healthy",
@@ -156,7 +167,10 @@ async def health_check():
     }
     
     # Check Cosmos DB connection
-    if db_available:
+    if not db_ready.is_set():
+        health_status["database"] = "initializing"
+        health_status["status"] = "degraded"
+    elif is_db_available():
         try:
             from database.cosmos_client import database
             # Quick test: try to read database properties
@@ -171,7 +185,13 @@ async def health_check():
     
     # Check blob storage
     if blob_available:
-        health_status["blob_storage"] = "available"
+        try:
+            # Cheapest authenticated round trip to the storage account
+            get_blob_service_client().get_service_properties()
+            health_status["blob_storage"] = "available"
+        except Exception as e:
+            health_status["blob_storage"] = f"error: {str(e)[:100]}"
+            health_status["status"] = "degraded"
     else:
         health_status["blob_storage"] = "not_configured"
         health_status["status"] = "degraded"
@@ -215,7 +235,7 @@ async def process_audio_api(
 
         logger.info(f"[{session_id}] 🎙️ Starting transcription with Deepgram...")
         transcription_start = time.time()
-        transcript, diarized_segments = processor.transcribe_file(filepath)
+        transcript, diarized_segments = await run_in_threadpool(processor.transcribe_file, filepath)
         transcription_time = time.time() - transcription_start
         
         if not transcript:
@@ -225,21 +245,20 @@ async def process_audio_api(
 
         corrected_transcript = transcript
         is_realtime_flag = is_realtime and is_realtime.lower() == "true"
-        correction_time = 0
         
         if is_realtime_flag:
-            logger.info(f"[{session_id}] 🔧 Option 1 detected: Correcting transcript labels with Gemini...")
-            correction_start = time.time()
-            corrected_transcript = processor.correct_diarization(transcript)
-            correction_time = time.time() - correction_start
-            logger.info(f"[{session_id}] ✅ Transcript labels corrected. Using corrected transcript for SOAP generation. (Time: {correction_time:.2f}s)")
+            # One Gemini call fixes the labels and writes the SOAP note, so the transcript is sent once
+            logger.info(f"[{session_id}] 🔧 Option 1 detected: Correcting transcript labels and creating SOAP with Gemini...")
+            soap_start = time.time()
+            corrected_transcript, gemini_summary_raw = await run_in_threadpool(processor.correct_and_soap, transcript)
+            soap_time = time.time() - soap_start
+            logger.info(f"[{session_id}] ✅ Transcript labels corrected and SOAP generated. (Time: {soap_time:.2f}s)")
         else:
             logger.info(f"[{session_id}] Option 2 detected: Skipping transcript correction.")
-
-        logger.info(f"[{session_id}] 🤖 Passing transcript to Gemini for SOAP creation...")
-        soap_start = time.time()
-        gemini_summary_raw = processor.generate_soap(corrected_transcript)
-        soap_time = time.time() - soap_start
+            logger.info(f"[{session_id}] 🤖 Passing transcript to Gemini for SOAP creation...")
+            soap_start = time.time()
+            gemini_summary_raw = await run_in_threadpool(processor.generate_soap, corrected_transcript)
+            soap_time = time.time() - soap_start
         
         if not gemini_summary_raw:
             logger.error(f"[{session_id}] Gemini summary generation failed for {audio.filename}.")
@@ -254,8 +273,9 @@ async def process_audio_api(
         logger.info(f"[{session_id}]   • File Save: {file_save_time:.2f}s")
         logger.info(f"[{session_id}]   • Deepgram Transcription: {transcription_time:.2f}s")
         if is_realtime_flag:
-            logger.info(f"[{session_id}]   • Gemini Label Correction: {correction_time:.2f}s")
-        logger.info(f"[{session_id}]   • Gemini SOAP Creation: {soap_time:.2f}s")
+            logger.info(f"[{session_id}]   • Gemini Label Correction + SOAP Creation: {soap_time:.2f}s")
+        else:
+            logger.info(f"[{session_id}]   • Gemini SOAP Creation: {soap_time:.2f}s")
         logger.info(f"[{session_id}]   • TOTAL TIME: {total_time:.2f}s")
 
         response_data = {
@@ -267,7 +287,9 @@ async def process_audio_api(
             "timing": {
                 "file_save_time": round(file_save_time, 2),
                 "transcription_time": round(transcription_time, 2),
-                "correction_time": round(correction_time, 2) if is_realtime_flag else 0,
+                # Label correction runs inside the SOAP call and is counted in soap_generation_time;
+                # kept as a number so clients that format or sum the timings keep working
+                "correction_time": 0.0,
                 "soap_generation_time": round(soap_time, 2),
                 "total_time": round(total_time, 2)
             }
@@ -275,10 +297,12 @@ async def process_audio_api(
         
         if patient_id:
             try:
-                soap_record = save_soap_record(
+                soap_record = await run_in_threadpool(
+                    save_soap_record,
                     patient_id=patient_id,
                     audio_file_name=audio.filename,
                     audio_local_path=filepath,
+                    audio_bytes=contents,
                     transcript=corrected_transcript,
                     original_transcript=transcript if is_realtime_flag else None,
                     soap_sections=soap_sections
@@ -303,7 +327,7 @@ async def process_audio_api(
 
 
 @app.post("/approve_plan")
-async def approve_plan_api(payload: dict = Body(...)):
+def approve_plan_api(payload: dict = Body(...)):
     """
     Approves the extracted medical plan and executes agent actions
     like processing medicines and scheduling appointments.
@@ -382,7 +406,7 @@ async def approve_plan_api(payload: dict = Body(...)):
 
 
 @app.post("/user_chat")
-async def user_chat_api(payload: dict = Body(...)):
+def user_chat_api(payload: dict = Body(...)):
     """
     Handle user questions about their SOAP summary.
     Uses Gemini to determine if question is related to SOAP summary and answers accordingly.
@@ -459,7 +483,7 @@ async def user_chat_api(payload: dict = Body(...)):
 
 
 @app.post("/patients")
-async def create_patient_api(payload: dict = Body(...), user: dict = Depends(get_current_user)):
+def create_patient_api(payload: dict = Body(...), user: dict = Depends(get_current_user)):
     """
     Create a new patient record for the current authenticated user.
     """
@@ -514,10 +538,108 @@ async def create_patient_api(payload: dict = Body(...), user: dict = Depends(get
         )
 
 
+def _write_patients_bulk_background(planned: list, user_id: str, session_id: str):
+    """Finish a wait=false bulk create. The client already has its 202, so failures can only be logged."""
+    try:
+        _, errors = write_patients_bulk(planned, user_id)
+    except Exception as e:
+        failed = [row['patient_id'] for row in planned]
+        logger.error(f"[{session_id}] Background bulk create failed for patient IDs {failed}: {e}")
+        return
+    if errors:
+        ids_by_index = {row['index']: row['patient_id'] for row in planned}
+        failed = [ids_by_index[error['index']] for error in errors]
+        logger.error(f"[{session_id}] Background bulk create failed for patient IDs {failed}")
+
+
+@app.post("/patients/bulk")
+def create_patients_bulk_api(background_tasks: BackgroundTasks, payload: dict = Body(...),
+                             wait: bool = True, user: dict = Depends(get_current_user)):
+    """
+    Create several patients for the current authenticated user in one request.
+    Expects {"patients": [{"name": ..., "address": ..., ...}, ...]}.
+    With wait=false the IDs are assigned immediately and the response is 202;
+    encryption and writes finish after the response is sent.
+
+    wait=false is fire-and-forget: a 202 only means the listed rows passed
+    validation. Write failures after the response are logged server-side and
+    are not reported back, so a returned ID is not proof the patient exists.
+    Confirm with GET /patients, or use wait=true to get per-row failures (207).
+    """
+    client_session_id = payload.get('session_id') if isinstance(payload, dict) else None
+    session_id = set_session_id(client_session_id or str(uuid.uuid4())[:8])
+
+    rows = payload.get('patients') if isinstance(payload, dict) else None
+    if not isinstance(rows, list) or not rows or not all(isinstance(row, dict) for row in rows):
+        return JSONResponse(
+            content={
+                "status": "error",
+                "message": "A non-empty 'patients' list is required."
+            },
+            status_code=400
+        )
+    logger.info(f"[{session_id}] Received request to create {len(rows)} patients")
+
+    try:
+        logged = get_logged_user_by_google(user['email'])
+        if not logged:
+            logged = get_or_create_logged_user(user['email'], user.get('name'))
+
+        if not logged:
+            raise Exception("Authenticated user not found and could not be created")
+
+        if not wait:
+            planned, errors = plan_patients_bulk(rows)
+            background_tasks.add_task(_write_patients_bulk_background, planned, logged['id'], session_id)
+            logger.info(f"[{session_id}] Bulk create queued: {len(planned)} accepted, {len(errors)} rejected")
+            return JSONResponse(
+                content={
+                    "status": "accepted",
+                    "message": "Patients are being created; confirm them with GET /patients.",
+                    "patients": [{"index": row['index'], "id": row['patient_id']} for row in planned],
+                    "errors": errors
+                },
+                status_code=202
+            )
+
+        patients, errors = create_patients_bulk(rows, user_id=logged['id'])
+        logger.info(f"[{session_id}] Bulk create: {len(patients)} created, {len(errors)} failed")
+
+        return JSONResponse(
+            content={
+                "status": "success" if not errors else "partial",
+                "patients": patients,
+                "errors": errors
+            },
+            status_code=200 if not errors else 207
+        )
+    except ValueError as e:
+        return JSONResponse(
+            content={
+                "status": "error",
+                "message": str(e)
+            },
+            status_code=400
+        )
+    except Exception as e:
+        logger.error(f"[{session_id}] Error bulk creating patients: {e}", exc_info=True)
+        return JSONResponse(
+            content={
+                "status": "error",
+                "message": f"Failed to create patients: {str(e)}"
+            },
+            status_code=500
+        )
+
+
 @app.get("/patients")
-async def get_patients_api(user: dict = Depends(get_current_user), session_id: str = None):
+def get_patients_api(user: dict = Depends(get_current_user), session_id: str = None,
+                     continuation: str = None, page_size: int = Query(None, ge=1, le=MAX_PAGE_SIZE)):
     """
     Get all patients for the current authenticated user.
+
+    Pass `page_size` (or a `continuation` token from a previous response) to get
+    one page at a time; the response then includes the next `continuation`.
     """
 
     client_session_id = session_id
@@ -535,6 +657,22 @@ async def get_patients_api(user: dict = Depends(get_current_user), session_id: s
                 },
                 status_code=404
             )
+        if continuation is not None or page_size is not None:
+            patients, next_continuation = get_patients_page(
+                user_id=logged['id'],
+                continuation=continuation,
+                page_size=page_size
+            )
+            logger.info(f"[{session_id_obj}] Retrieved page of {len(patients)} patients")
+            return JSONResponse(
+                content={
+                    "status": "success",
+                    "patients": patients,
+                    "continuation": next_continuation
+                },
+                status_code=200
+            )
+
         patients = get_all_patients(user_id=logged['id'])
         logger.info(f"[{session_id_obj}] Retrieved {len(patients)} patients")
         
@@ -557,7 +695,7 @@ async def get_patients_api(user: dict = Depends(get_current_user), session_id: s
 
 
 @app.get("/patients/{patient_id}")
-async def get_patient_api(patient_id: int, user: dict = Depends(get_current_user)):
+def get_patient_api(patient_id: int, user: dict = Depends(get_current_user)):
     """
     Get a patient by token ID (only if it belongs to the current user).
     """
@@ -612,7 +750,7 @@ async def google_auth(payload: dict = Body(...), response: Response = Response()
             logger.warning(f"[{session_id}] Google authentication failed: token missing")
             raise HTTPException(status_code=400, detail="Google token is required")
         
-        user_data = verify_google_token(google_token)
+        user_data = await run_in_threadpool(verify_google_token, google_token)
         if not user_data:
             logger.warning(f"[{session_id}] Google authentication failed: invalid token")
             raise HTTPException(status_code=401, detail="Invalid Google token")
@@ -673,14 +811,15 @@ async def register(payload: dict = Body(...)):
         raise HTTPException(status_code=400, detail='Email and password are required')
 
     try:
-        existing = get_user_by_email(email)
+        existing = await run_in_threadpool(get_user_by_email, email)
         if existing:
             logger.info(f"[{session_id}] Registration attempted for existing user (PII omitted)")
             raise HTTPException(status_code=400, detail='User already registered')
 
         name = (payload.get('name') or '').strip()
-        hashed = hash_password(password)
-        create_user(email, hashed, name)
+        # PBKDF2 and the Cosmos write both block, so keep them off the event loop
+        hashed = await run_in_threadpool(hash_password, password)
+        await run_in_threadpool(create_user, email, hashed, name)
         logger.info(f"[{session_id}] User registered via email/password")
 
         
@@ -708,12 +847,12 @@ async def email_login(payload: dict = Body(...), response: Response = Response()
         raise HTTPException(status_code=400, detail='Email and password are required')
 
     try:
-        user = get_user_by_email(email)
+        user = await run_in_threadpool(get_user_by_email, email)
         if not user or not user.get('is_verified'):
             raise HTTPException(status_code=401, detail='Invalid credentials')
 
         stored_hash = user.get('password_hash')
-        if not stored_hash or not verify_password(password, stored_hash):
+        if not stored_hash or not await run_in_threadpool(verify_password, password, stored_hash):
             raise HTTPException(status_code=401, detail='Invalid credentials')
 
         # Build user data for JWT
@@ -794,10 +933,15 @@ async def logout(request: Request, response: Response):
 
 
 @app.get("/patient/{patient_id}/soap_records")
-async def get_patient_soap_records_api(patient_id: int, user: dict = Depends(get_current_user)):
+def get_patient_soap_records_api(patient_id: int, summary: bool = False,
+                                 continuation: str = None,
+                                 page_size: int = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                                 user: dict = Depends(get_current_user)):
     """
     Get all SOAP records for a patient (only if it belongs to the current user).
     Returns a list of all medical notes with transcripts for the patient.
+    With summary=true only metadata is returned; fetch a full note from /soap_record/{record_id}.
+    Pass `page_size` (or a `continuation` token) to page through the records like /patients.
     """
     try:
         logged = get_logged_user_by_google(user['email'])
@@ -811,8 +955,20 @@ async def get_patient_soap_records_api(patient_id: int, user: dict = Depends(get
                 status_code=404
             )
         
-        records = get_patient_soap_records(patient_id)
-        voice_recordings = get_voice_recordings(patient_id)
+        paged = continuation is not None or page_size is not None
+        next_continuation = None
+        if paged:
+            records, next_continuation = get_patient_soap_records_page(
+                patient_id,
+                continuation=continuation,
+                page_size=page_size,
+                fields=SOAP_SUMMARY_FIELDS if summary else None
+            )
+        elif summary:
+            records = get_patient_soap_records_summary(patient_id)
+        else:
+            records = get_patient_soap_records(patient_id)
+        voice_recordings = get_voice_recordings(patient_id, fields=('soap_record_id', 'storage_path'))
         
         voice_recording_map = {}
         for vr in voice_recordings:
@@ -824,28 +980,82 @@ async def get_patient_soap_records_api(patient_id: int, user: dict = Depends(get
         for record in records:
             record_id = record.get("id")
             storage_path = voice_recording_map.get(record_id, record.get("audio_file_name"))
-            formatted_records.append({
+            formatted = {
                 "id": record_id,
                 "patient_id": record.get("patient_id"),
                 "audio_file_name": record.get("audio_file_name"),
                 "storage_path": storage_path, 
-                "transcript": record.get("transcript"),
-                "original_transcript": record.get("original_transcript"),
-                "soap_sections": record.get("soap_sections"),
                 "created_at": record.get("created_at"),
                 "updated_at": record.get("updated_at")
-            })
+            }
+            if not summary:
+                formatted["transcript"] = record.get("transcript")
+                formatted["original_transcript"] = record.get("original_transcript")
+                formatted["soap_sections"] = record.get("soap_sections")
+            formatted_records.append(formatted)
+        content = {
+            "status": "success",
+            "patient_id": patient_id,
+            "soap_records": formatted_records,
+            "total_records": len(formatted_records)
+        }
+        if paged:
+            content["continuation"] = next_continuation
+        return JSONResponse(content=content, status_code=200)
+    except Exception as e:
+        logger.error(f"Error fetching SOAP records for patient {patient_id}: {e}")
+        return JSONResponse(
+            content={
+                "status": "error",
+                "message": str(e)
+            },
+            status_code=500
+        )
+
+
+@app.get("/soap_record/{record_id}")
+def get_soap_record_api(record_id: int, user: dict = Depends(get_current_user)):
+    """
+    Get a single SOAP record with its transcripts (only if its patient belongs to the current user).
+    """
+    try:
+        logged = get_logged_user_by_google(user['email'])
+        if not logged:
+            return JSONResponse(
+                content={
+                    "status": "error",
+                    "message": "Authenticated user not found in database."
+                },
+                status_code=404
+            )
+        record = get_soap_record_by_id(record_id)
+        if not record or not get_patient_by_id(record.get("patient_id"), user_id=logged['id']):
+            return JSONResponse(
+                content={
+                    "status": "error",
+                    "message": "SOAP record not found or access denied."
+                },
+                status_code=404
+            )
+        
         return JSONResponse(
             content={
                 "status": "success",
-                "patient_id": patient_id,
-                "soap_records": formatted_records,
-                "total_records": len(formatted_records)
+                "soap_record": {
+                    "id": record.get("id"),
+                    "patient_id": record.get("patient_id"),
+                    "audio_file_name": record.get("audio_file_name"),
+                    "transcript": record.get("transcript"),
+                    "original_transcript": record.get("original_transcript"),
+                    "soap_sections": record.get("soap_sections"),
+                    "created_at": record.get("created_at"),
+                    "updated_at": record.get("updated_at")
+                }
             },
             status_code=200
         )
     except Exception as e:
-        logger.error(f"Error fetching SOAP records for patient {patient_id}: {e}")
+        logger.error(f"Error fetching SOAP record {record_id}: {e}")
         return JSONResponse(
             content={
                 "status": "error",
@@ -856,7 +1066,7 @@ async def get_patient_soap_records_api(patient_id: int, user: dict = Depends(get
 
 
 @app.put("/soap_record/{record_id}")
-async def update_soap_record_api(record_id: int, payload: dict = Body(...)):
+def update_soap_record_api(record_id: int, payload: dict = Body(...)):
     """
     Update SOAP sections for an existing record.
     Used when doctor edits the SOAP summary.
@@ -906,7 +1116,7 @@ async def update_soap_record_api(record_id: int, payload: dict = Body(...)):
 
 
 @app.get("/download_audio")
-async def download_audio(request: Request, storage_path: str):
+def download_audio(request: Request, storage_path: str):
     """
     Download encrypted audio from Azure Blob Storage, decrypt it server-side,
     and stream back the plaintext audio bytes with the appropriate content-type.
@@ -927,10 +1137,7 @@ async def download_audio(request: Request, storage_path: str):
         logger.info(f"[{session_id}] 📦 Attempting to download from container: {container_name}")
         
         try:
-            blob_client = blob_service_client.get_blob_client(
-                container=container_name,
-                blob=storage_path
-            )
+            blob_client = get_blob_container_client(container_name).get_blob_client(storage_path)
             download_stream = blob_client.download_blob()
             enc_raw = download_stream.readall()
             logger.info(f"[{session_id}] ✅ Downloaded {len(enc_raw)} bytes from Azure Blob Storage")
@@ -939,10 +1146,9 @@ async def download_audio(request: Request, storage_path: str):
             raise HTTPException(status_code=404, detail=f"File not found in storage: {storage_path}")
 
         logger.info(f"[{session_id}] 🔓 Starting decryption...")
-        enc_b64 = base64.b64encode(enc_raw).decode('utf-8')
         
         try:
-            plaintext = decrypt_bytes(enc_b64)
+            plaintext = decrypt_bytes_raw(enc_raw)
             logger.info(f"[{session_id}] ✅ Decryption successful, plaintext size: {len(plaintext)} bytes")
         except Exception as decrypt_error:
             logger.error(f"[{session_id}] ❌ Decryption failed: {decrypt_error}", exc_info=True)
@@ -4,9 +4,9 @@ from google.auth.transport import requests
 from typing import Optional, Dict
 import jwt
 from datetime import datetime, timedelta
-from dotenv import load_dotenv
+from utils.env import load_env
 
-load_dotenv()
+load_env()
 
 GOOGLE_CLIENT_ID = os.getenv('GOOGLE_CLIENT_ID')
 JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
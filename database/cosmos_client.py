@@ -7,16 +7,72 @@ Requirements:
 - azure-identity (for Managed Identity)
 """
 import os
+import re
+import time
+import tempfile
 import logging
-from azure.storage.blob import BlobServiceClient
-from azure.identity import DefaultAzureCredential
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Optional
 from azure.cosmos import CosmosClient, PartitionKey, exceptions
-from dotenv import load_dotenv
+from azure.core.pipeline.transport import RequestsTransport
+from requests import Session
+from requests.adapters import HTTPAdapter
+from utils.env import load_env
 
-load_dotenv()
+load_env()
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True)
+class AzureConfig:
+    """Azure settings read from the environment once at import."""
+    cosmos_endpoint: Optional[str]
+    cosmos_database_name: str
+    cosmos_key: Optional[str]
+    cosmos_max_connections: int
+    cosmos_bootstrap: Optional[str]
+    cosmos_bootstrap_marker: str
+    blob_connection_string: Optional[str]
+    blob_account_url: Optional[str]
+    cosmos_warmup: bool
+    identity_endpoint: Optional[str]
+    managed_identity_client_id: Optional[str]
+    website_site_name: Optional[str]
+    disabled: bool
+
+    @classmethod
+    def from_env(cls) -> "AzureConfig":
+        return cls(
+            cosmos_endpoint=os.getenv('COSMOS_ENDPOINT'),
+            cosmos_database_name=os.getenv('COSMOS_DATABASE_NAME', 'medical-db'),
+            cosmos_key=os.getenv('COSMOS_KEY'),
+            # Pooled HTTPS connections kept per worker for Cosmos DB and Blob (requests defaults to 10)
+            cosmos_max_connections=int(os.getenv('COSMOS_MAX_CONNECTIONS', '200')),
+            cosmos_bootstrap=os.getenv('COSMOS_BOOTSTRAP'),
+            # Written after a successful bootstrap so later worker starts skip the management calls
+            cosmos_bootstrap_marker=os.getenv(
+                'COSMOS_BOOTSTRAP_MARKER',
+                os.path.join(tempfile.gettempdir(), '.cosmos_bootstrapped')
+            ),
+            cosmos_warmup=os.getenv('COSMOS_WARMUP', '1') == '1',
+            blob_connection_string=os.getenv('AZURE_STORAGE_CONNECTION_STRING'),
+            blob_account_url=os.getenv('AZURE_STORAGE_ACCOUNT_URL'),
+            # App Service sets IDENTITY_ENDPOINT when a managed identity is enabled
+            identity_endpoint=os.getenv('IDENTITY_ENDPOINT'),
+            managed_identity_client_id=os.getenv('AZURE_MANAGED_IDENTITY_CLIENT_ID'),
+            website_site_name=os.getenv('WEBSITE_SITE_NAME'),
+            # Set on workers that never touch Cosmos or Blob so no Azure client is built
+            disabled=os.getenv('AZURE_CLIENT_DISABLED') == '1',
+        )
+
+
+CFG = AzureConfig.from_env()
+
 cosmos_client = None
 database = None
 db_available = False
@@ -28,165 +84,486 @@ CONTAINER_VOICE_RECORDINGS = "voice_recordings"
 CONTAINER_LOGGED_USERS = "logged_users"
 
 
-containers = {
-    CONTAINER_PATIENTS: None,
-    CONTAINER_SOAP_RECORDS: None,
-    CONTAINER_VOICE_RECORDINGS: None,
-    CONTAINER_LOGGED_USERS: None,
-}
-
-try:
-    COSMOS_ENDPOINT = os.getenv('COSMOS_ENDPOINT')
-    COSMOS_DATABASE_NAME = os.getenv('COSMOS_DATABASE_NAME', 'medical-db')
-    COSMOS_KEY = os.getenv('COSMOS_KEY')  
-    
-    if not COSMOS_ENDPOINT:
-        logger.warning("⚠️ COSMOS_ENDPOINT not set. Cosmos DB operations will fail.")
-        raise ValueError("COSMOS_ENDPOINT is required")
-    
-    
-    if COSMOS_KEY:
-        logger.info("🔐 Using Cosmos DB with key-based authentication")
-        cosmos_client = CosmosClient(COSMOS_ENDPOINT, COSMOS_KEY)
-    else:
-        logger.info("🔐 Using Cosmos DB with Managed Identity")
-        credential = DefaultAzureCredential()
-        cosmos_client = CosmosClient(COSMOS_ENDPOINT, credential=credential)
-    
-    
-    try:
-        database = cosmos_client.get_database_client(COSMOS_DATABASE_NAME)
-        database.read()
-        logger.info(f"✅ Connected to existing Cosmos DB database: {COSMOS_DATABASE_NAME}")
-    except exceptions.CosmosResourceNotFoundError:
-        logger.info(f"📦 Creating new Cosmos DB database: {COSMOS_DATABASE_NAME}")
-        database = cosmos_client.create_database(COSMOS_DATABASE_NAME)
-        logger.info(f"✅ Created Cosmos DB database: {COSMOS_DATABASE_NAME}")
-    
-    db_available = True
-    logger.info("✅ Azure Cosmos DB initialized successfully")
-    
-except Exception as e:
-    logger.error(f"❌ Error initializing Cosmos DB: {e}")
-    logger.warning("⚠️ App will start but database operations will fail")
-    import traceback
-    logger.error(traceback.format_exc())
+CONTAINER_NAMES = (
+    CONTAINER_PATIENTS,
+    CONTAINER_SOAP_RECORDS,
+    CONTAINER_VOICE_RECORDINGS,
+    CONTAINER_LOGGED_USERS,
+)
 
+# Read-only name -> container client map, replaced wholesale by bind_containers()
+containers = MappingProxyType({})
 
-def ensure_containers_exist():
+
+# Refresh cached AAD tokens this many seconds before they expire
+TOKEN_REFRESH_MARGIN_SECONDS = 300
+
+
+class _CachedTokenCredential:
     """
-    Ensure all required containers exist. Create them if they don't.
-    This function should be called on app startup.
+    Wrap an Azure TokenCredential and reuse its tokens per scope until they are
+    close to expiry, so Cosmos and Blob clients share one token fetch.
     """
-    if not db_available or not database:
-        logger.error("❌ Cannot create containers: Cosmos DB not available")
-        return False
-    
-    container_configs = [
-        {
-            'name': CONTAINER_PATIENTS,
-            'partition_key': PartitionKey(path="/id"),
-            'description': 'Patient records'
-        },
-        {
-            'name': CONTAINER_SOAP_RECORDS,
-            'partition_key': PartitionKey(path="/id"),
-            'description': 'SOAP medical records'
-        },
-        {
-            'name': CONTAINER_VOICE_RECORDINGS,
-            'partition_key': PartitionKey(path="/id"),
-            'description': 'Voice recording metadata'
-        },
-        {
-            'name': CONTAINER_LOGGED_USERS,
-            'partition_key': PartitionKey(path="/id"),
-            'description': 'Logged user records'
-        },
-    ]
-    
-    for config in container_configs:
-        container_name = config['name']
+
+    def __init__(self, credential):
+        self._credential = credential
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def _fresh(self, token) -> bool:
+        return token is not None and time.time() < token.expires_on - TOKEN_REFRESH_MARGIN_SECONDS
+
+    def get_token(self, *scopes, **kwargs):
+        # Claims challenges and tenant overrides must always hit the real credential
+        if kwargs.get('claims') or kwargs.get('tenant_id'):
+            return self._credential.get_token(*scopes, **kwargs)
+
+        token = self._tokens.get(scopes)
+        if self._fresh(token):
+            return token
+
+        with self._lock:
+            token = self._tokens.get(scopes)
+            if not self._fresh(token):
+                token = self._credential.get_token(*scopes, **kwargs)
+                self._tokens[scopes] = token
+            return token
+
+
+@functools.lru_cache(maxsize=1)
+def get_credential():
+    """
+    Return the process-wide Azure credential, importing azure.identity on first use.
+
+    This is the canonical credential for any module that authenticates to Azure with
+    the app identity: sharing one instance means one token cache per process instead
+    of one per client.
+    """
+    # On App Service only the managed identity (or a service principal in app
+    # settings) can work, so skip DefaultAzureCredential's probing.
+    if CFG.identity_endpoint or CFG.website_site_name:
+        from azure.identity import ChainedTokenCredential, EnvironmentCredential, ManagedIdentityCredential
+        logger.debug("[AUTH] Using ManagedIdentityCredential (then EnvironmentCredential) for Azure services")
+        return _CachedTokenCredential(ChainedTokenCredential(
+            ManagedIdentityCredential(client_id=CFG.managed_identity_client_id),
+            EnvironmentCredential(),
+        ))
+
+    # Interactive/developer-tool credentials never apply on a server and are slow to rule out
+    from azure.identity import DefaultAzureCredential
+    return _CachedTokenCredential(DefaultAzureCredential(
+        exclude_interactive_browser_credential=True,
+        exclude_visual_studio_code_credential=True,
+        exclude_shared_token_cache_credential=True,
+    ))
+
+
+STORAGE_SCOPE = "https://storage.azure.com/.default"
+
+
+def _credential_scopes() -> list:
+    """Scopes this process will request with get_credential(), given its config."""
+    scopes = []
+    if CFG.cosmos_endpoint and not CFG.cosmos_key:
+        # azure-cosmos asks for a token scoped to the account endpoint
+        scopes.append(CFG.cosmos_endpoint.rstrip('/') + "/.default")
+    if CFG.blob_account_url and not CFG.blob_connection_string:
+        scopes.append(STORAGE_SCOPE)
+    return scopes
+
+
+def _warm_credential(scopes: list):
+    """Fetch tokens ahead of the first request so it does not pay the IMDS/AAD round trip."""
+    for scope in scopes:
+        try:
+            get_credential().get_token(scope)
+        except Exception as e:
+            logger.warning("[WARN] Token warmup for %s failed: %s", scope, e)
+
+
+# How long a caller waits for the background Cosmos init before giving up
+DB_INIT_TIMEOUT_SECONDS = 30
+
+# Set once the background Cosmos init has finished, whether or not it succeeded
+db_ready = threading.Event()
+
+
+def cosmos_bootstrap_needed() -> bool:
+    """
+    Decide whether this process should create the database/containers.
+    COSMOS_BOOTSTRAP=1 forces it, COSMOS_BOOTSTRAP=0 disables it; otherwise
+    it runs until the bootstrap marker file exists on this instance.
+    """
+    if CFG.cosmos_bootstrap is not None:
+        return CFG.cosmos_bootstrap == '1'
+    return not os.path.exists(CFG.cosmos_bootstrap_marker)
+
+
+def _mark_bootstrapped():
+    try:
+        with open(CFG.cosmos_bootstrap_marker, 'w'):
+            pass
+    except OSError as e:
+        logger.warning("[WARN] Could not write Cosmos bootstrap marker %s: %s", CFG.cosmos_bootstrap_marker, e)
+
+
+@functools.lru_cache(maxsize=1)
+def _shared_session() -> Session:
+    """One HTTPS connection pool per process, shared by the Cosmos and Blob clients."""
+    session = Session()
+    adapter = HTTPAdapter(pool_connections=CFG.cosmos_max_connections, pool_maxsize=CFG.cosmos_max_connections)
+    session.mount('https://', adapter)
+    return session
+
+
+def _azure_transport() -> RequestsTransport:
+    """Transport over the shared session; closing a client leaves the session open."""
+    return RequestsTransport(session=_shared_session(), session_owner=False)
+
+
+# Identifies this service's traffic in Cosmos DB diagnostics
+COSMOS_USER_AGENT = "acucogn-scribe-backend"
+
+
+@functools.lru_cache(maxsize=1)
+def get_cosmos_client() -> CosmosClient:
+    """Return the process-wide CosmosClient, building it on first use."""
+    if CFG.cosmos_key:
+        logger.debug("[AUTH] Using Cosmos DB with key-based authentication")
+        credential = CFG.cosmos_key
+    else:
+        logger.debug("[AUTH] Using Cosmos DB with Managed Identity")
+        credential = get_credential()
+
+    return CosmosClient(
+        CFG.cosmos_endpoint,
+        credential=credential,
+        transport=_azure_transport(),
+        connection_verify=True,
+        retry_total=3,
+        user_agent=COSMOS_USER_AGENT,
+    )
+
+
+# Cosmos DB resource ids: letters, digits, '-' and '_' only
+_DATABASE_NAME_RE = re.compile(r'^[A-Za-z0-9_-]{1,255}$')
+
+
+def _validate_config():
+    """Check the shape of the Cosmos settings so bad config fails before any network call."""
+    if not CFG.cosmos_endpoint:
+        raise RuntimeError("COSMOS_ENDPOINT is required")
+    if not CFG.cosmos_endpoint.startswith('https://'):
+        raise RuntimeError(f"COSMOS_ENDPOINT must be an https:// URL, got '{CFG.cosmos_endpoint}'")
+    if not _DATABASE_NAME_RE.match(CFG.cosmos_database_name):
+        raise RuntimeError(f"Invalid COSMOS_DATABASE_NAME '{CFG.cosmos_database_name}'")
+
+
+def _init_cosmos():
+    """Connect to Cosmos DB off the import path so workers can boot without waiting on it."""
+    global cosmos_client, database, db_available
+
+    try:
+        cosmos_client = get_cosmos_client()
+
         try:
-            
-            container = database.get_container_client(container_name)
-            container.read()
-            containers[container_name] = container
-            logger.info(f"✅ Container '{container_name}' already exists")
+            database = cosmos_client.get_database_client(CFG.cosmos_database_name)
+            database.read()
+            logger.info("[OK] Connected to existing Cosmos DB database: %s", CFG.cosmos_database_name)
         except exceptions.CosmosResourceNotFoundError:
-            
-            try:
-                logger.info(f"📦 Creating container '{container_name}'...")
-                
-                container = database.create_container(
-                    id=container_name,
-                    partition_key=config['partition_key']
-                )
-                containers[container_name] = container
-                logger.info(f"✅ Created container '{container_name}'")
-            except Exception as create_error:
-                logger.error(f"❌ Failed to create container '{container_name}': {create_error}")
+            if not cosmos_bootstrap_needed():
                 raise
-        except Exception as e:
-            logger.error(f"❌ Error checking/creating container '{container_name}': {e}")
-            raise
-    
-    logger.info("✅ All Cosmos DB containers are ready")
-    return True
+            logger.info("[CREATE] Creating new Cosmos DB database: %s", CFG.cosmos_database_name)
+            database = cosmos_client.create_database(CFG.cosmos_database_name)
+            logger.info("[OK] Created Cosmos DB database: %s", CFG.cosmos_database_name)
+
+        bind_containers()
+        db_available = True
+        logger.info("[OK] Azure Cosmos DB initialized successfully")
 
+    except Exception as e:
+        logger.error("[FAIL] Error initializing Cosmos DB: %s", e)
+        logger.warning("[WARN] App will start but database operations will fail")
+        logger.debug("Cosmos DB init traceback", exc_info=True)
+    finally:
+        db_ready.set()
 
-def get_container(container_name: str):
-    """Get a container client by name."""
-    if container_name not in containers or containers[container_name] is None:
-        if not db_available or not database:
-            raise RuntimeError("Cosmos DB is not available")
+    if db_available and CFG.cosmos_warmup:
+        _warm_containers()
+
+
+def _warm_containers():
+    """
+    Run one tiny query per container so the first user request finds open
+    connections and cached partition routing instead of paying for them.
+    """
+    for container_name, container in containers.items():
         try:
-            containers[container_name] = database.get_container_client(container_name)
+            list(container.query_items(
+                "SELECT TOP 1 c.id FROM c",
+                enable_cross_partition_query=True
+            ))
         except Exception as e:
-            logger.error(f"❌ Failed to get container '{container_name}': {e}")
-            raise
-    return containers[container_name]
+            logger.warning("[WARN] Warmup query on '%s' failed: %s", container_name, e)
+    logger.info("[OK] Cosmos DB connections warmed")
 
 
+def is_db_available(timeout: float = DB_INIT_TIMEOUT_SECONDS) -> bool:
+    """Wait (up to `timeout` seconds) for the background Cosmos init and report whether it succeeded."""
+    db_ready.wait(timeout)
+    return db_available
 
-blob_service_client = None
-blob_available = False
 
-try:
-    AZURE_STORAGE_CONNECTION_STRING = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
-    AZURE_STORAGE_ACCOUNT_URL = os.getenv("AZURE_STORAGE_ACCOUNT_URL")
-    
-    if AZURE_STORAGE_CONNECTION_STRING:
-        logger.info("🔐 Using Blob Storage connection string")
-        blob_service_client = BlobServiceClient.from_connection_string(
-            AZURE_STORAGE_CONNECTION_STRING
+def _indexing_policy(*composite_indexes) -> dict:
+    """Default index-everything policy plus the given composite indexes."""
+    return {
+        'indexingMode': 'consistent',
+        'automatic': True,
+        'includedPaths': [{'path': '/*'}],
+        'excludedPaths': [{'path': '/"_etag"/?'}],
+        'compositeIndexes': [list(index) for index in composite_indexes],
+    }
+
+
+CONTAINER_CONFIGS = [
+    {
+        'name': CONTAINER_PATIENTS,
+        'partition_key': PartitionKey(path="/id"),
+        'description': 'Patient records',
+        # Serves "WHERE c.user_id = @user_id ORDER BY c.created_at DESC" from the index
+        'indexing_policy': _indexing_policy(
+            ({'path': '/user_id', 'order': 'ascending'}, {'path': '/created_at', 'order': 'descending'}),
+        ),
+    },
+    {
+        'name': CONTAINER_SOAP_RECORDS,
+        'partition_key': PartitionKey(path="/id"),
+        'description': 'SOAP medical records',
+        # Serves "WHERE c.patient_id = @patient_id ORDER BY c.created_at DESC" from the index
+        'indexing_policy': _indexing_policy(
+            ({'path': '/patient_id', 'order': 'ascending'}, {'path': '/created_at', 'order': 'descending'}),
+        ),
+    },
+    {
+        'name': CONTAINER_VOICE_RECORDINGS,
+        'partition_key': PartitionKey(path="/id"),
+        'description': 'Voice recording metadata',
+        'indexing_policy': _indexing_policy(
+            ({'path': '/patient_id', 'order': 'ascending'}, {'path': '/created_at', 'order': 'descending'}),
+        ),
+    },
+    {
+        'name': CONTAINER_LOGGED_USERS,
+        'partition_key': PartitionKey(path="/id"),
+        'description': 'Logged user records'
+    },
+]
+
+
+def _create_container(config: dict):
+    """Create one missing container."""
+    container_name = config['name']
+    try:
+        logger.info("[CREATE] Creating container '%s'...", container_name)
+        container = database.create_container(
+            id=container_name,
+            partition_key=config['partition_key'],
+            indexing_policy=config.get('indexing_policy')
         )
-        blob_available = True
-        logger.info("✅ Azure Blob Storage initialized")
-        
-    elif AZURE_STORAGE_ACCOUNT_URL:
-        logger.info("🔐 Using Blob Storage with Managed Identity")
-        credential = DefaultAzureCredential()
-        blob_service_client = BlobServiceClient(
-            account_url=AZURE_STORAGE_ACCOUNT_URL,
-            credential=credential
+        logger.info("[OK] Created container '%s'", container_name)
+        return container
+    except exceptions.CosmosResourceExistsError:
+        # Another worker created it between our listing and this call
+        return database.get_container_client(container_name)
+    except Exception as create_error:
+        logger.error("[FAIL] Failed to create container '%s': %s", container_name, create_error)
+        raise
+
+
+def _update_indexing_policy(config: dict):
+    """Apply the configured indexing policy to an existing container (reindexes in the background)."""
+    container_name = config['name']
+    try:
+        logger.info("[CREATE] Updating indexing policy of container '%s'...", container_name)
+        database.replace_container(
+            container_name,
+            partition_key=config['partition_key'],
+            indexing_policy=config['indexing_policy']
         )
-        
-        list(blob_service_client.list_containers(max_results=1))
-        blob_available = True
-        logger.info("✅ Azure Blob Storage initialized with Managed Identity")
+        logger.info("[OK] Updated indexing policy of container '%s'", container_name)
+    except Exception as e:
+        logger.error("[FAIL] Failed to update indexing policy of container '%s': %s", container_name, e)
+        raise
+
+
+def _indexing_outdated(config: dict, properties: dict) -> bool:
+    wanted = config.get('indexing_policy')
+    if not wanted:
+        return False
+    current = properties.get('indexingPolicy') or {}
+    return (current.get('compositeIndexes') or []) != wanted['compositeIndexes']
+
+
+def bind_containers():
+    """Bind a client for every container. Purely local: no metadata calls."""
+    global containers
+    containers = MappingProxyType({
+        container_name: database.get_container_client(container_name)
+        for container_name in CONTAINER_NAMES
+    })
+    get_container.cache_clear()
+
+
+def bootstrap_containers():
+    """
+    Verify every container exists with its configured indexing policy, creating or
+    updating as needed, and write the bootstrap marker. Safe to run repeatedly;
+    production starts skip it.
+    """
+    # One listing call tells us which containers exist and how they are indexed;
+    # only missing or outdated containers cost a round trip
+    existing = {c['id']: c for c in database.list_containers()}
+    tasks = [
+        (_create_container, config) if config['name'] not in existing else (_update_indexing_policy, config)
+        for config in CONTAINER_CONFIGS
+        if config['name'] not in existing or _indexing_outdated(config, existing[config['name']])
+    ]
+
+    # Creates/updates are independent, so run them side by side
+    first_error = None
+    if tasks:
+        with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+            futures = [executor.submit(task, config) for task, config in tasks]
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    if first_error is None:
+                        first_error = e
+
+    # Every task has finished by now; surface the first failure as before
+    if first_error is not None:
+        raise first_error
+
+    logger.info("[OK] All Cosmos DB containers are ready")
+    _mark_bootstrapped()
+
+
+def ensure_containers_exist():
+    """
+    Run bootstrap_containers() when cosmos_bootstrap_needed() is true.
+    Containers are already bound by the background init, so otherwise this is a no-op.
+    This function should be called on app startup.
+    """
+    if not db_available or not database:
+        logger.error("[FAIL] Cannot create containers: Cosmos DB not available")
+        return False
+
+    if cosmos_bootstrap_needed():
+        bootstrap_containers()
+    else:
+        logger.info("[OK] Cosmos DB containers bound (bootstrap skipped)")
+    return True
+
+
+def _resolve_container(container_name: str):
+    """Get a container client by name, waiting for the background init if it is still running."""
+    try:
+        return containers[container_name]
+    except KeyError:
+        pass
+    if not db_ready.is_set():
+        db_ready.wait(DB_INIT_TIMEOUT_SECONDS)
+        if container_name in containers:
+            return containers[container_name]
+    raise RuntimeError(f"Cosmos DB container '{container_name}' is not bound")
+
+
+# Container clients are long-lived, so a successful lookup is cached (failures are not)
+get_container = functools.lru_cache(maxsize=8)(_resolve_container)
+
+
+if CFG.disabled:
+    logger.info("Azure clients disabled (AZURE_CLIENT_DISABLED=1)")
+    db_ready.set()
+else:
+    try:
+        _validate_config()
+    except RuntimeError as e:
+        logger.error("[FAIL] Invalid Cosmos DB configuration: %s", e)
+        logger.warning("[WARN] App will start but database operations will fail")
+        db_ready.set()
     else:
-        logger.warning("⚠️ No Blob Storage credentials configured")
-        logger.warning("Set either AZURE_STORAGE_CONNECTION_STRING or AZURE_STORAGE_ACCOUNT_URL")
+        threading.Thread(target=_init_cosmos, name="cosmos-init", daemon=True).start()
+    _scopes = _credential_scopes()
+    if _scopes:
+        threading.Thread(target=_warm_credential, args=(_scopes,), name="credential-warmup", daemon=True).start()
+
+
+blob_available = not CFG.disabled and bool(CFG.blob_connection_string or CFG.blob_account_url)
+
+if blob_available and not CFG.blob_connection_string and not CFG.blob_account_url.startswith('https://'):
+    logger.error("[FAIL] AZURE_STORAGE_ACCOUNT_URL must be an https:// URL, got '%s'", CFG.blob_account_url)
+    blob_available = False
+
+
+# Audio above one block is sent as parallel 4 MiB blocks instead of a single PUT
+BLOB_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=1)
+def get_blob_service_client():
+    """Return the shared BlobServiceClient, building it on first use."""
+    if not blob_available:
+        raise RuntimeError("Azure Blob Storage is not configured")
+
+    from azure.storage.blob import BlobServiceClient
+
+    if CFG.blob_connection_string:
+        logger.debug("[AUTH] Using Blob Storage connection string")
+        return BlobServiceClient.from_connection_string(
+            CFG.blob_connection_string,
+            transport=_azure_transport(),
+            max_single_put_size=BLOB_BLOCK_SIZE,
+            max_block_size=BLOB_BLOCK_SIZE
+        )
+
+    logger.debug("[AUTH] Using Blob Storage with Managed Identity")
+    return BlobServiceClient(
+        account_url=CFG.blob_account_url,
+        credential=get_credential(),
+        transport=_azure_transport(),
+        max_single_put_size=BLOB_BLOCK_SIZE,
+        max_block_size=BLOB_BLOCK_SIZE
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def get_blob_container_client(container_name: str):
+    """Return a cached ContainerClient; per-blob clients derived from it reuse its pipeline."""
+    return get_blob_service_client().get_container_client(container_name)
+
+
+if not CFG.disabled and not (CFG.blob_connection_string or CFG.blob_account_url):
+    logger.warning("[WARN] No Blob Storage credentials configured")
+    logger.warning("Set either AZURE_STORAGE_CONNECTION_STRING or AZURE_STORAGE_ACCOUNT_URL")
 
-except Exception as e:
-    logger.error(f"❌ Error initializing Blob Storage: {e}")
-    logger.warning("⚠️ Blob Storage operations will fail")
 
+logger.info(
+    "Azure services: cosmos=%s blob=%s",
+    'disabled' if CFG.disabled else 'initializing',
+    'available' if blob_available else 'unavailable',
+    extra={
+        'cosmos': 'disabled' if CFG.disabled else 'initializing',
+        'blob': blob_available,
+        'containers': list(CONTAINER_NAMES),
+    },
+)
 
-logger.info("=" * 60)
-logger.info("=== Azure Services Status ===")
-logger.info(f"  Cosmos DB: {'✅ Available' if db_available else '❌ Unavailable'}")
-logger.info(f"  Blob Storage: {'✅ Available' if blob_available else '❌ Unavailable'}")
-logger.info("=" * 60)
 
+if __name__ == "__main__":
+    # COSMOS_BOOTSTRAP=1 python -m database.cosmos_client creates the database and containers
+    logging.basicConfig(level=logging.INFO)
+    if not is_db_available():
+        raise SystemExit("Cosmos DB is not available")
+    bootstrap_containers()
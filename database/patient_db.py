@@ -3,15 +3,19 @@ Patient database operations using Azure Cosmos DB.
 Migrated from Azure SQL for better connectivity and reliability.
 """
 import os
-import uuid
+import secrets
 import json
 import time
+import random
+import itertools
 import logging
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-import base64
+import functools
+from typing import Callable, List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import hashlib
-from azure.storage.blob import BlobServiceClient
+from operator import itemgetter
+
+from azure.cosmos import exceptions
 
 from database.cosmos_client import (
     get_container,
@@ -19,17 +23,15 @@ from database.cosmos_client import (
     CONTAINER_SOAP_RECORDS,
     CONTAINER_VOICE_RECORDINGS,
     CONTAINER_LOGGED_USERS,
-    blob_service_client,
-    db_available,
+    get_blob_container_client,
+    is_db_available,
     blob_available,
 )
 from utils.encryption import (
     encrypt_text,
-    decrypt_text,
+    decrypt_text_many,
     encrypt_json,
-    decrypt_json,
-    encrypt_bytes,
-    decrypt_bytes,
+    encrypt_bytes_raw,
 )
 
 logger = logging.getLogger("PatientDB")
@@ -39,7 +41,7 @@ CONTAINER_NAME = "voice-recordings"
 
 def check_db_available():
     """Check if database is available, raise exception if not."""
-    if not db_available:
+    if not is_db_available():
         raise RuntimeError(
             "Azure Cosmos DB is not available. "
             "Check configuration and ensure COSMOS_ENDPOINT is set."
@@ -48,58 +50,274 @@ def check_db_available():
 
 def check_blob_available():
     """Check if blob storage is available, raise exception if not."""
-    if not blob_available or not blob_service_client:
+    if not blob_available:
         raise RuntimeError(
             "Azure Blob Storage is not available. "
             "Please configure AZURE_STORAGE_CONNECTION_STRING or AZURE_STORAGE_ACCOUNT_URL."
         )
 
 
+# IDs are opaque to Cosmos and the frontend, so 128 random bits as hex will do
 def generate_token_id() -> str:
-    return str(uuid.uuid4())
+    return secrets.token_hex(16)
 
 
 def generate_user_id() -> str:
-    return str(uuid.uuid4())
+    return secrets.token_hex(16)
+
+
+# Low 10 bits of generated IDs; seeded randomly so gunicorn workers don't march in step
+_id_counter = itertools.count(random.getrandbits(10)).__next__
 
 
 def generate_numeric_id() -> int:
-    """Generate a numeric ID using timestamp and random component for Cosmos DB compatibility."""
-    # Use timestamp (seconds since epoch) + random component to create a unique numeric ID
-    import random
-    timestamp_sec = int(time.time())
-    random_component = random.randint(100, 999)
-    # Combine: timestamp (10 digits) + random (3 digits) = 13 digit number
-    # This ensures uniqueness while keeping reasonable size
-    numeric_id = timestamp_sec * 1000 + random_component
-    return numeric_id
-
-
-def convert_datetime_fields(data: Dict) -> Dict:
-    """Convert datetime objects to ISO format strings"""
-    if data is None:
-        return data
-    for key in data:
-        if isinstance(data[key], datetime):
-            data[key] = data[key].isoformat()
-    return data
-
-
-def _ensure_datetime_fields(doc: Dict) -> Dict:
-    """Ensure datetime fields are properly handled for Cosmos DB"""
-    if doc is None:
-        return doc
-    
-    # Cosmos DB stores dates as ISO strings, but we need to handle them properly
-    for key in ['created_at', 'updated_at']:
-        if key in doc and isinstance(doc[key], str):
+    """Generate a numeric ID using timestamp and a per-process counter for Cosmos DB compatibility."""
+    # Milliseconds since epoch << 10 | counter: 1024 IDs per ms per worker, and the
+    # result stays below 2**53 (until ~2248) so the frontend can hold it as a JS number
+    return ((time.time_ns() // 1_000_000) << 10) | (_id_counter() & 0x3FF)
+
+
+@functools.lru_cache(maxsize=4096)
+def _email_hash(email: Optional[str]) -> Tuple[str, str]:
+    """Return (normalized email, sha256 hex of it); memoized since logins repeat."""
+    email_norm = (email or '').strip().lower()
+    # A lookup key, not a security boundary, so skip the FIPS-approved-use checks
+    return email_norm, hashlib.sha256(email_norm.encode('utf-8'), usedforsecurity=False).hexdigest()
+
+
+# (epoch second, 'YYYY-MM-DDTHH:MM:SS') of the last _now_iso() call
+_iso_second = (None, '')
+
+
+def _now_iso() -> str:
+    """UTC now as 'YYYY-MM-DDTHH:MM:SS.ffffffZ'; the seconds part is formatted once per second."""
+    global _iso_second
+
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _iso_second
+    if second != cached_second:
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second))
+        _iso_second = (second, prefix)
+    return f"{prefix}.{int((now - second) * 1_000_000):06d}Z"
+
+
+PATIENT_ENCRYPTED_FIELDS = ('name', 'address', 'phone_number', 'problem')
+SOAP_ENCRYPTED_FIELDS = ('transcript', 'original_transcript', 'soap_sections')
+
+# Decryption of one query page overlaps with fetching the next
+_DECRYPT_WORKERS = os.cpu_count() or 4
+_decrypt_pool = ThreadPoolExecutor(max_workers=_DECRYPT_WORKERS, thread_name_prefix="decrypt")
+# Below this many rows a page is cheaper to decrypt on the calling thread
+_PARALLEL_DECRYPT_MIN_ROWS = 64
+
+
+def _transform_page(rows: List[Dict], transform: Callable[[List[Dict]], None]) -> List[Dict]:
+    transform(rows)
+    return rows
+
+
+def _transform_parallel(rows: List[Dict], transform: Callable[[List[Dict]], None]) -> None:
+    """
+    Apply a page-level transform across the decrypt pool in contiguous chunks.
+    AESGCM runs in OpenSSL with the GIL released, so chunks decrypt on separate cores.
+    Must not be called from a decrypt pool worker.
+    """
+    if len(rows) < _PARALLEL_DECRYPT_MIN_ROWS:
+        transform(rows)
+        return
+    size = -(-len(rows) // _DECRYPT_WORKERS)
+    chunks = [rows[i:i + size] for i in range(0, len(rows), size)]
+    for _ in _decrypt_pool.map(transform, chunks):
+        pass
+
+
+def _query_transformed(container, query: str, transform: Callable[[List[Dict]], None],
+                       parameters: Optional[List[Dict]] = None) -> List[Dict]:
+    """
+    Run a cross-partition query and apply the page-level `transform` to the rows in place.
+    Each page is handed to the decrypt pool as soon as it arrives, so AES work
+    on page N runs while page N+1 is still on the wire. Row order is preserved.
+    """
+    pages = container.query_items(
+        query=query,
+        parameters=parameters,
+        enable_cross_partition_query=True
+    ).by_page()
+
+    futures = [_decrypt_pool.submit(_transform_page, list(page), transform) for page in pages]
+
+    rows = []
+    for future in futures:
+        rows.extend(future.result())
+    return rows
+
+
+MAX_PAGE_SIZE = 1000
+
+
+def _query_page(container, query: str, transform: Callable[[List[Dict]], None],
+                parameters: Optional[List[Dict]] = None, continuation: Optional[str] = None,
+                page_size: Optional[int] = None) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Fetch a single page of a cross-partition query and apply the page-level `transform`.
+    page_size=None lets Cosmos choose the page size. Returns the rows and the
+    continuation token for the next page (None when there are no more rows).
+    """
+    if page_size is not None and not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise ValueError(f'page_size must be between 1 and {MAX_PAGE_SIZE}')
+    pager = container.query_items(
+        query=query,
+        parameters=parameters,
+        enable_cross_partition_query=True,
+        max_item_count=-1 if page_size is None else page_size
+    ).by_page(continuation)
+
+    rows = list(next(pager, []))
+    _transform_parallel(rows, transform)
+    return rows, pager.continuation_token
+
+
+def _normalize_id(doc: Dict, numeric_key: str) -> None:
+    """Expose the numeric ID (patient_id/record_id) as 'id' for frontend compatibility."""
+    numeric_id = doc.get(numeric_key)
+    if numeric_id is not None:
+        doc['id'] = numeric_id
+        return
+    doc_id = doc.get('id')
+    if isinstance(doc_id, str) and doc_id.isdigit():
+        doc['id'] = int(doc_id)
+
+
+def _decrypt_fields(docs: List[Dict], fields: Tuple[str, ...]) -> None:
+    """
+    Decrypt `fields` across all `docs` with a single decrypt_text_many call and
+    scatter the plaintexts back in place. Nothing is written unless every value
+    decrypts, so a failure leaves the documents untouched.
+    """
+    getter = itemgetter(*fields) if len(fields) > 1 else (lambda doc: (doc[fields[0]],))
+    try:
+        packed = [getter(doc) for doc in docs]
+    except KeyError:
+        # Projected queries may omit some fields
+        packed = [tuple(map(doc.get, fields)) for doc in docs]
+
+    plaintexts = iter(decrypt_text_many([value for row in packed for value in row if value]))
+    for doc, row in zip(docs, packed):
+        for field, value in zip(fields, row):
+            if value:
+                doc[field] = next(plaintexts)
+
+
+def _decrypt_page(rows: List[Dict], fields: Tuple[str, ...],
+                  finish: Callable[[Dict], None], decrypt_row: Callable[[Dict], None]) -> None:
+    """
+    Decrypt a whole page in one batch, then run `finish` on each row. If any
+    ciphertext in the batch is bad, fall back to `decrypt_row` per row so the
+    failure stays confined to the row it belongs to.
+    """
+    try:
+        _decrypt_fields(rows, fields)
+    except Exception:
+        for row in rows:
+            decrypt_row(row)
+        return
+    for row in rows:
+        finish(row)
+
+
+def _finish_patient_row(patient: Dict) -> None:
+    # Empty values are stored as None; hand them back as '' like before.
+    # Fields a projected query didn't select stay absent.
+    for field in PATIENT_ENCRYPTED_FIELDS:
+        if field in patient and patient[field] is None:
+            patient[field] = ''
+    _normalize_id(patient, 'patient_id')
+
+
+def _decrypt_patient_row(patient: Dict) -> None:
+    """Decrypt a patient document in place and normalize its ID for the frontend."""
+    try:
+        _decrypt_fields([patient], PATIENT_ENCRYPTED_FIELDS)
+        _finish_patient_row(patient)
+    except Exception:
+        logger.exception('Failed to decrypt patient fields')
+
+
+def _decrypt_patient_page(patients: List[Dict]) -> None:
+    _decrypt_page(patients, PATIENT_ENCRYPTED_FIELDS, _finish_patient_row, _decrypt_patient_row)
+
+
+def _finish_soap_row(record: Dict) -> None:
+    """Parse the already-decrypted soap_sections JSON and normalize the ID."""
+    try:
+        if record.get('soap_sections'):
             try:
-                # Try to parse ISO string back to datetime if needed
-                doc[key] = datetime.fromisoformat(doc[key].replace('Z', '+00:00'))
-            except:
-                pass
+                record['soap_sections'] = json.loads(record['soap_sections']) or {}
+            except ValueError:
+                record['soap_sections'] = {}
+            logger.debug(f"Record {record.get('id')}: Decrypted SOAP sections: {record['soap_sections']}")
+        elif 'soap_sections' in record:
+            logger.warning(f"Record {record.get('id')}: soap_sections is empty or None")
+            record['soap_sections'] = {}
+
+        _normalize_id(record, 'record_id')
+    except Exception as e:
+        logger.exception(f"Failed to decrypt soap record {record.get('id')}: {e}")
+        record['soap_sections'] = {}
+
+
+def _decrypt_soap_row(record: Dict) -> None:
+    """Decrypt a SOAP record document in place and normalize its ID for the frontend."""
+    try:
+        _decrypt_fields([record], SOAP_ENCRYPTED_FIELDS)
+    except Exception as e:
+        logger.exception(f"Failed to decrypt soap record {record.get('id')}: {e}")
+        record['soap_sections'] = {}
+        return
+    _finish_soap_row(record)
+
+
+def _decrypt_soap_page(records: List[Dict]) -> None:
+    _decrypt_page(records, SOAP_ENCRYPTED_FIELDS, _finish_soap_row, _decrypt_soap_row)
+
+
+def _enc_or_none(text: Optional[str]) -> Optional[str]:
+    """Encrypt non-empty text; empty values are stored as None rather than encrypted."""
+    return encrypt_text(text) if text else None
+
+
+def _new_patient(name: str, address: str, phone_number: str, problem: str, user_id: str,
+                 patient_id: Optional[int] = None) -> Tuple[Dict, Dict]:
+    """Build the encrypted patient document and the plaintext response for it."""
+    # Generate numeric ID for backward compatibility with frontend
+    if patient_id is None:
+        patient_id = generate_numeric_id()
+    # Use string ID for Cosmos DB document ID (partition key)
+    patient_id_str = str(patient_id)
+    created_at = _now_iso()
+    
+    patient_doc = {
+        'id': patient_id_str,  # Cosmos DB document ID (string)
+        'patient_id': patient_id,  # Numeric ID for frontend compatibility
+        'user_id': user_id,
+        'name': encrypt_text(name),
+        'address': _enc_or_none(address),
+        'phone_number': _enc_or_none(phone_number),
+        'problem': _enc_or_none(problem),
+        'created_at': created_at,
+    }
     
-    return doc
+    # Answer from the plaintext we already hold instead of decrypting what was just stored
+    patient = {
+        **patient_doc,
+        'name': name,
+        'address': address or '',
+        'phone_number': phone_number or '',
+        'problem': problem or '',
+    }
+    _normalize_id(patient, 'patient_id')
+    return patient_doc, patient
 
 
 def create_patient(name: str, address: str = '', phone_number: str = '', problem: str = '', user_id: str = '') -> Dict:
@@ -112,44 +330,10 @@ def create_patient(name: str, address: str = '', phone_number: str = '', problem
     try:
         container = get_container(CONTAINER_PATIENTS)
         
-        # Generate numeric ID for backward compatibility with frontend
-        patient_id = generate_numeric_id()
-        # Use string ID for Cosmos DB document ID (partition key)
-        patient_id_str = str(patient_id)
-        created_at = datetime.utcnow().isoformat() + 'Z'
-        
-        patient_doc = {
-            'id': patient_id_str,  # Cosmos DB document ID (string)
-            'patient_id': patient_id,  # Numeric ID for frontend compatibility
-            'user_id': user_id,
-            'name': encrypt_text(name),
-            'address': encrypt_text(address),
-            'phone_number': encrypt_text(phone_number),
-            'problem': encrypt_text(problem),
-            'created_at': created_at,
-        }
-        
-        # Create item in Cosmos DB
+        patient_doc, patient = _new_patient(name, address, phone_number, problem, user_id)
         container.create_item(body=patient_doc)
         
-        logger.info(f"Patient created for user_id: {user_id}, patient_id: {patient_id}")
-        
-        # Retrieve and decrypt
-        patient = container.read_item(item=patient_id_str, partition_key=patient_id_str)
-        
-        # Decrypt sensitive fields
-        patient['name'] = decrypt_text(patient['name'])
-        patient['address'] = decrypt_text(patient['address'])
-        patient['phone_number'] = decrypt_text(patient['phone_number'])
-        patient['problem'] = decrypt_text(patient['problem'])
-        
-        # Use numeric patient_id for frontend compatibility
-        if 'patient_id' in patient:
-            patient['id'] = patient['patient_id']
-        else:
-            patient['id'] = int(patient['id']) if patient['id'].isdigit() else patient_id
-        
-        convert_datetime_fields(patient)
+        logger.info(f"Patient created for user_id: {user_id}, patient_id: {patient['patient_id']}")
         
         return patient
     except Exception as e:
@@ -157,57 +341,122 @@ def create_patient(name: str, address: str = '', phone_number: str = '', problem
         raise Exception(f"Failed to create patient: {e}")
 
 
-def get_all_patients(user_id: str = '') -> List[Dict]:
-    """Get all patients for a user."""
+MAX_BULK_PATIENTS = 500
+# Each patient is its own partition, so bulk creates fan out as concurrent point writes
+_bulk_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="bulk-write")
+
+
+def plan_patients_bulk(rows: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Validate bulk rows and assign their patient IDs up front, without touching the database.
+    Returns the planned rows and {'index', 'error'} entries for rows that were rejected.
+    """
+    if len(rows) > MAX_BULK_PATIENTS:
+        raise ValueError(f'At most {MAX_BULK_PATIENTS} patients can be created per request')
+
+    planned: List[Dict] = []
+    errors: List[Dict] = []
+    for index, row in enumerate(rows):
+        # JSON numbers or lists would fail on .strip(); reject the row, not the batch
+        not_text = [field for field in PATIENT_ENCRYPTED_FIELDS
+                    if row.get(field) is not None and not isinstance(row.get(field), str)]
+        if not_text:
+            errors.append({'index': index, 'error': f"Fields must be strings: {', '.join(not_text)}."})
+            continue
+        values = {field: (row.get(field) or '').strip() for field in PATIENT_ENCRYPTED_FIELDS}
+        if not values['name']:
+            errors.append({'index': index, 'error': 'Patient name is required.'})
+            continue
+        planned.append({'index': index, 'patient_id': generate_numeric_id(), **values})
+    return planned, errors
+
+
+def _write_planned_patient(container, row: Dict, user_id: str) -> Dict:
+    patient_doc, patient = _new_patient(row['name'], row['address'], row['phone_number'],
+                                        row['problem'], user_id, patient_id=row['patient_id'])
+    container.create_item(body=patient_doc)
+    return patient
+
+
+def write_patients_bulk(planned: List[Dict], user_id: str) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Encrypt and write rows from plan_patients_bulk on the bulk pool.
+    Rows are independent, so one failure doesn't undo the others.
+    """
+    check_db_available()
+    
+    if not user_id:
+        raise ValueError('user_id is required to create patients')
+
+    container = get_container(CONTAINER_PATIENTS)
+    futures = [(row['index'], _bulk_pool.submit(_write_planned_patient, container, row, user_id))
+               for row in planned]
+    
+    created: List[Dict] = []
+    errors: List[Dict] = []
+    for index, future in futures:
+        try:
+            created.append(future.result())
+        except Exception as e:
+            logger.error(f"write_patients_bulk row {index} error: {e}")
+            errors.append({'index': index, 'error': str(e)})
+    
+    logger.info(f"Bulk created {len(created)} patients for user_id: {user_id} ({len(errors)} failed)")
+    return created, errors
+
+
+def create_patients_bulk(rows: List[Dict], user_id: str) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Create many patients for one logged user.
+    Each row takes the same fields as create_patient. Returns the created patients
+    and a list of {'index', 'error'} entries for rows that failed.
+    """
+    planned, errors = plan_patients_bulk(rows)
+    created, write_errors = write_patients_bulk(planned, user_id)
+    errors.extend(write_errors)
+    errors.sort(key=lambda error: error['index'])
+    return created, errors
+
+
+# Fields callers may project in list queries; anything else is rejected
+PATIENT_FIELDS = ('id', 'patient_id', 'user_id', 'name', 'address', 'phone_number', 'problem', 'created_at')
+SOAP_RECORD_FIELDS = ('id', 'record_id', 'patient_id', 'audio_file_name', 'transcript',
+                      'original_transcript', 'soap_sections', 'created_at', 'updated_at')
+# List views only need these; transcripts and SOAP sections come from get_soap_record_by_id
+SOAP_SUMMARY_FIELDS = ('id', 'record_id', 'patient_id', 'audio_file_name', 'created_at', 'updated_at')
+VOICE_RECORDING_FIELDS = ('id', 'voice_id', 'patient_id', 'soap_record_id', 'storage_path',
+                          'file_name', 'is_realtime', 'created_at')
+
+
+def _select_clause(fields: Optional[Tuple[str, ...]], allowed: Tuple[str, ...]) -> str:
+    """Build the SELECT list for `fields` ('*' when None), whitelisted against `allowed`."""
+    if fields is None:
+        return "*"
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields requested: {', '.join(unknown)}")
+    return ", ".join(f"c.{field}" for field in fields)
+
+
+def _patients_query(user_id: str, fields: Optional[Tuple[str, ...]] = None) -> Tuple[str, List[Dict]]:
+    # Never fall back to listing every user's patients
+    if not user_id:
+        raise ValueError('user_id is required to list patients')
+    select = _select_clause(fields, PATIENT_FIELDS)
+    query = f"SELECT {select} FROM c WHERE c.user_id = @user_id ORDER BY c.created_at DESC"
+    return query, [{"name": "@user_id", "value": user_id}]
+
+
+def get_all_patients(user_id: str, fields: Optional[Tuple[str, ...]] = None) -> List[Dict]:
+    """Get all patients for a user. `fields` limits the projection (see PATIENT_FIELDS)."""
     check_db_available()
     
     try:
         container = get_container(CONTAINER_PATIENTS)
-        
-        if user_id:
-            # Query patients by user_id
-            query = "SELECT * FROM c WHERE c.user_id = @user_id ORDER BY c.created_at DESC"
-            parameters = [{"name": "@user_id", "value": user_id}]
-            items = container.query_items(
-                query=query,
-                parameters=parameters,
-                enable_cross_partition_query=True
-            )
-        else:
-            # Get all patients
-            query = "SELECT * FROM c ORDER BY c.created_at DESC"
-            items = container.query_items(
-                query=query,
-                enable_cross_partition_query=True
-            )
-        
-        patients = list(items)
+        query, parameters = _patients_query(user_id, fields)
         
         # Decrypt patient fields and normalize IDs
-        for patient in patients:
-            try:
-                if patient.get('name'):
-                    patient['name'] = decrypt_text(patient['name'])
-                if patient.get('address'):
-                    patient['address'] = decrypt_text(patient['address'])
-                if patient.get('phone_number'):
-                    patient['phone_number'] = decrypt_text(patient['phone_number'])
-                if patient.get('problem'):
-                    patient['problem'] = decrypt_text(patient['problem'])
-                
-                # Use numeric patient_id for frontend compatibility
-                if 'patient_id' in patient:
-                    patient['id'] = patient['patient_id']
-                else:
-                    # Try to convert string ID to int if possible
-                    try:
-                        patient['id'] = int(patient['id'])
-                    except (ValueError, TypeError):
-                        pass
-                
-                convert_datetime_fields(patient)
-            except Exception:
-                logger.exception('Failed to decrypt patient fields')
+        patients = _query_transformed(container, query, _decrypt_patient_page, parameters)
         
         return patients
     except Exception as e:
@@ -215,60 +464,45 @@ def get_all_patients(user_id: str = '') -> List[Dict]:
         raise Exception(f"Failed to get patients: {e}")
 
 
-def get_patient_by_id(patient_id: int, user_id: str = '') -> Optional[Dict]:
-    """Get a patient by ID."""
+def get_patients_page(user_id: str, continuation: Optional[str] = None,
+                      page_size: Optional[int] = None, fields: Optional[Tuple[str, ...]] = None) -> Tuple[List[Dict], Optional[str]]:
+    """Get one page of a user's patients plus the continuation token for the next page."""
+    check_db_available()
+    
+    try:
+        container = get_container(CONTAINER_PATIENTS)
+        query, parameters = _patients_query(user_id, fields)
+        return _query_page(container, query, _decrypt_patient_page, parameters, continuation, page_size)
+    except Exception as e:
+        logger.error(f"get_patients_page error: {e}")
+        raise Exception(f"Failed to get patients: {e}")
+
+
+def get_patient_by_id(patient_id: int, user_id: str) -> Optional[Dict]:
+    """Get a patient by ID, or None if it doesn't exist or belongs to another user."""
     check_db_available()
     
+    if not user_id:
+        raise ValueError('user_id is required to read a patient')
+
     try:
         container = get_container(CONTAINER_PATIENTS)
         
         # Convert patient_id to string for Cosmos DB lookup
         patient_id_str = str(patient_id)
         
-        # Try to find by document ID first, then by patient_id field
+        # The document id is always str(patient_id), so a point read is authoritative
         try:
             patient = container.read_item(item=patient_id_str, partition_key=patient_id_str)
-        except Exception:
-            # If not found by ID, query by patient_id field
-            query = "SELECT * FROM c WHERE c.patient_id = @patient_id"
-            parameters = [{"name": "@patient_id", "value": patient_id}]
-            items = list(container.query_items(
-                query=query,
-                parameters=parameters,
-                enable_cross_partition_query=True
-            ))
-            if not items:
-                return None
-            patient = items[0]
+        except exceptions.CosmosResourceNotFoundError:
+            return None
         
         # Check ownership
-        if user_id and patient.get('user_id') != user_id:
+        if patient.get('user_id') != user_id:
             logger.warning(f"Access denied: user {user_id} tried to access patient {patient_id}")
             return None
         
-        # Decrypt patient fields
-        try:
-            if patient.get('name'):
-                patient['name'] = decrypt_text(patient['name'])
-            if patient.get('address'):
-                patient['address'] = decrypt_text(patient['address'])
-            if patient.get('phone_number'):
-                patient['phone_number'] = decrypt_text(patient['phone_number'])
-            if patient.get('problem'):
-                patient['problem'] = decrypt_text(patient['problem'])
-            
-            # Use numeric patient_id for frontend compatibility
-            if 'patient_id' in patient:
-                patient['id'] = patient['patient_id']
-            else:
-                try:
-                    patient['id'] = int(patient['id'])
-                except (ValueError, TypeError):
-                    pass
-            
-            convert_datetime_fields(patient)
-        except Exception:
-            logger.exception('Failed to decrypt patient')
+        _decrypt_patient_row(patient)
         
         return patient
     except Exception as e:
@@ -276,75 +510,124 @@ def get_patient_by_id(patient_id: int, user_id: str = '') -> Optional[Dict]:
         raise Exception(f"Failed to get patient: {e}")
 
 
+# Audio uploads overlap with the Cosmos writes in save_soap_record
+_upload_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="blob-upload")
+# Parallel block uploads per blob; only used once the payload exceeds one block
+BLOB_UPLOAD_CONCURRENCY = 4
+
+
+def _upload_audio(storage_path: str, raw: bytes) -> None:
+    """Encrypt audio and upload it to Azure Blob Storage."""
+    from azure.storage.blob import BlobType, ContentSettings
+
+    try:
+        enc_bytes = encrypt_bytes_raw(raw)
+        
+        blob_client = get_blob_container_client(CONTAINER_NAME).get_blob_client(storage_path)
+        # The stored bytes are ciphertext, not playable audio, so label them as such
+        blob_client.upload_blob(
+            enc_bytes,
+            blob_type=BlobType.BLOCKBLOB,
+            length=len(enc_bytes),
+            overwrite=True,
+            max_concurrency=BLOB_UPLOAD_CONCURRENCY,
+            content_settings=ContentSettings(content_type='application/octet-stream')
+        )
+        logger.info(f"Uploaded audio to Blob Storage: {storage_path}")
+    except Exception:
+        logger.exception('Failed to encrypt/upload audio')
+        raise
+
+
+def _discard_upload(upload_future, storage_path: str) -> None:
+    """Wait for an in-flight audio upload and delete the blob it wrote, if any."""
+    try:
+        upload_future.result()
+    except Exception:
+        return  # Nothing was stored
+    try:
+        get_blob_container_client(CONTAINER_NAME).delete_blob(storage_path)
+        logger.info(f"Deleted orphaned audio blob: {storage_path}")
+    except Exception:
+        logger.exception(f'Failed to delete orphaned audio blob {storage_path}')
+
+
 def save_soap_record(patient_id: int, audio_file_name: str = None, audio_local_path: str = None,
                      transcript: str = '', original_transcript: Optional[str] = None,
-                     soap_sections: Optional[Dict] = None) -> Dict:
-    """Save a SOAP record and optionally upload audio to Azure Blob Storage."""
+                     soap_sections: Optional[Dict] = None, audio_bytes: Optional[bytes] = None) -> Dict:
+    """
+    Save a SOAP record and optionally upload audio to Azure Blob Storage.
+    Pass `audio_bytes` when the caller already holds the audio; `audio_local_path`
+    is then only used for the file name.
+    """
     check_db_available()
     
     storage_path = None
+    upload_future = None
     
     try:
         # Upload audio to Azure Blob Storage if provided
-        if audio_local_path and os.path.exists(audio_local_path):
+        if audio_bytes is not None or (audio_local_path and os.path.exists(audio_local_path)):
             check_blob_available()
             
             timestamp = int(time.time())
-            filename = audio_file_name or os.path.basename(audio_local_path)
+            filename = audio_file_name or os.path.basename(audio_local_path or '')
             storage_path = f"{patient_id}/{timestamp}_{filename}"
             
-            with open(audio_local_path, 'rb') as f:
-                raw = f.read()
+            if audio_bytes is not None:
+                raw = audio_bytes
+            else:
+                logger.info(f"Reading audio for upload from disk: {audio_local_path}")
+                with open(audio_local_path, 'rb') as f:
+                    raw = f.read()
+            
+            # The SOAP document only needs storage_path, so write it while the upload runs
+            upload_future = _upload_pool.submit(_upload_audio, storage_path, raw)
+        
+        try:
+            # Save SOAP record to Cosmos DB
+            soap_container = get_container(CONTAINER_SOAP_RECORDS)
+            
+            # Generate numeric record ID for backward compatibility
+            record_id = generate_numeric_id()
+            record_id_str = str(record_id)
+            created_at = _now_iso()
+            
+            audio_file_to_store = storage_path if storage_path else audio_file_name
+            
+            logger.info(f"SOAP sections before encryption: {soap_sections}")
             
+            soap_doc = {
+                'id': record_id_str,  # Cosmos DB document ID (string)
+                'record_id': record_id,  # Numeric ID for frontend compatibility
+                'patient_id': patient_id,  # Keep as int for queries
+                'audio_file_name': audio_file_to_store,
+                'transcript': encrypt_text(transcript),
+                'original_transcript': encrypt_text(original_transcript) if original_transcript is not None else None,
+                'soap_sections': encrypt_json(soap_sections or {}),
+                'created_at': created_at,
+                'updated_at': created_at,
+            }
+            
+            logger.info(f"SOAP sections encrypted: {soap_doc['soap_sections']}")
+            soap_container.create_item(body=soap_doc)
+        except Exception:
+            # No record will reference the audio, so don't leave the blob behind
+            if upload_future is not None:
+                _discard_upload(upload_future, storage_path)
+            raise
+        
+        if upload_future is not None:
             try:
-                # Encrypt audio data
-                enc_b64 = encrypt_bytes(raw)
-                enc_bytes = base64.b64decode(enc_b64)
-                
-                # Upload to Azure Blob Storage
-                blob_client = blob_service_client.get_blob_client(
-                    container=CONTAINER_NAME,
-                    blob=storage_path
-                )
-                blob_client.upload_blob(enc_bytes, overwrite=True)
-                logger.info(f"Uploaded audio to Blob Storage: {storage_path}")
+                upload_future.result()
             except Exception as upload_error:
-                logger.exception('Failed to encrypt/upload audio')
+                # Don't leave a SOAP record pointing at audio that was never stored
+                try:
+                    soap_container.delete_item(item=record_id_str, partition_key=record_id_str)
+                except Exception:
+                    logger.exception(f'Failed to roll back SOAP record {record_id} after upload failure')
                 raise Exception(f"Audio upload failed: {upload_error}")
         
-        # Save SOAP record to Cosmos DB
-        soap_container = get_container(CONTAINER_SOAP_RECORDS)
-        
-        # Generate numeric record ID for backward compatibility
-        record_id = generate_numeric_id()
-        record_id_str = str(record_id)
-        created_at = datetime.utcnow().isoformat() + 'Z'
-        
-        audio_file_to_store = storage_path if storage_path else audio_file_name
-        
-        logger.info(f"SOAP sections before encryption: {soap_sections}")
-        
-        soap_doc = {
-            'id': record_id_str,  # Cosmos DB document ID (string)
-            'record_id': record_id,  # Numeric ID for frontend compatibility
-            'patient_id': patient_id,  # Keep as int for queries
-            'audio_file_name': audio_file_to_store,
-            'transcript': encrypt_text(transcript),
-            'original_transcript': encrypt_text(original_transcript) if original_transcript is not None else None,
-            'soap_sections': encrypt_json(soap_sections or {}),
-            'created_at': created_at,
-            'updated_at': created_at,
-        }
-        
-        logger.info(f"SOAP sections encrypted: {soap_doc['soap_sections']}")
-        soap_container.create_item(body=soap_doc)
-        
-        # Retrieve the inserted record
-        record = soap_container.read_item(item=record_id_str, partition_key=record_id_str)
-        
-        if not record:
-            raise Exception('Failed to retrieve inserted soap record')
-        
         # Create voice_recordings entry if audio was uploaded
         if storage_path:
             voice_container = get_container(CONTAINER_VOICE_RECORDINGS)
@@ -357,36 +640,22 @@ def save_soap_record(patient_id: int, audio_file_name: str = None, audio_local_p
                 'patient_id': patient_id,
                 'soap_record_id': record_id,
                 'storage_path': storage_path,
-                'file_name': audio_file_name or os.path.basename(audio_local_path),
+                'file_name': filename,
                 'is_realtime': False,
                 'created_at': created_at,
             }
             
             voice_container.create_item(body=voice_doc)
         
-        record['storage_path'] = storage_path
-        
-        # Decrypt fields and normalize ID
-        try:
-            if record.get('transcript'):
-                record['transcript'] = decrypt_text(record['transcript'])
-            if record.get('original_transcript'):
-                record['original_transcript'] = decrypt_text(record['original_transcript'])
-            if record.get('soap_sections'):
-                record['soap_sections'] = decrypt_json(record['soap_sections'])
-            
-            # Use numeric record_id for frontend compatibility
-            if 'record_id' in record:
-                record['id'] = record['record_id']
-            else:
-                try:
-                    record['id'] = int(record['id'])
-                except (ValueError, TypeError):
-                    pass
-        except Exception:
-            logger.exception('Failed to decrypt soap record')
-        
-        convert_datetime_fields(record)
+        # Answer from the plaintext we already hold instead of decrypting what was just stored
+        record = {
+            **soap_doc,
+            'transcript': transcript,
+            'original_transcript': original_transcript,
+            'soap_sections': soap_sections or {},
+            'storage_path': storage_path,
+        }
+        _normalize_id(record, 'record_id')
         
         return record
     except Exception as e:
@@ -394,105 +663,107 @@ def save_soap_record(patient_id: int, audio_file_name: str = None, audio_local_p
         raise
 
 
-def get_patient_soap_records(patient_id: int) -> List[Dict]:
-    """Get all SOAP records for a patient."""
+def _soap_records_query(fields: Optional[Tuple[str, ...]] = None) -> str:
+    select = _select_clause(fields, SOAP_RECORD_FIELDS)
+    return f"SELECT {select} FROM c WHERE c.patient_id = @patient_id ORDER BY c.created_at DESC"
+
+
+def get_patient_soap_records(patient_id: int, fields: Optional[Tuple[str, ...]] = None) -> List[Dict]:
+    """Get all SOAP records for a patient. `fields` limits the projection (see SOAP_RECORD_FIELDS)."""
     check_db_available()
     
     try:
         container = get_container(CONTAINER_SOAP_RECORDS)
         
         
-        query = "SELECT * FROM c WHERE c.patient_id = @patient_id ORDER BY c.created_at DESC"
+        query = _soap_records_query(fields)
         parameters = [{"name": "@patient_id", "value": patient_id}]  
         
-        items = container.query_items(
-            query=query,
-            parameters=parameters,
-            enable_cross_partition_query=True
-        )
-        
-        records = list(items)
+        records = _query_transformed(container, query, _decrypt_soap_page, parameters)
         logger.info(f"Retrieved {len(records)} SOAP records for patient {patient_id}")
         
         
         if len(records) == 0:
             logger.warning(f"No SOAP records found for patient_id={patient_id}")
-            
+        
+        # Full cross-partition scan, so only when explicitly asked for while debugging
+        if len(records) == 0 and os.getenv('SOAP_DEBUG_SCAN') == '1' and logger.isEnabledFor(logging.DEBUG):
             debug_query = "SELECT DISTINCT c.patient_id FROM c"
             debug_items = list(container.query_items(
                 query=debug_query,
                 enable_cross_partition_query=True
             ))
-            logger.info(f"Available patient_ids in database: {debug_items}")
-        
+            logger.debug(f"Available patient_ids in database: {debug_items}")
         
-        for i, record in enumerate(records):
-            try:
-                logger.debug(f"Record {i}: soap_sections type = {type(record.get('soap_sections'))}, value = {record.get('soap_sections')}")
-                
-                if record.get('transcript'):
-                    record['transcript'] = decrypt_text(record['transcript'])
-                if record.get('original_transcript'):
-                    record['original_transcript'] = decrypt_text(record['original_transcript'])
-                if record.get('soap_sections'):
-                    decrypted_soap = decrypt_json(record['soap_sections'])
-                    logger.info(f"Record {i}: Decrypted SOAP sections: {decrypted_soap}")
-                    record['soap_sections'] = decrypted_soap or {}
-                else:
-                    logger.warning(f"Record {i}: soap_sections is empty or None")
-                    record['soap_sections'] = {}
-                
-                
-                if 'record_id' in record:
-                    record['id'] = record['record_id']
-                else:
-                    try:
-                        record['id'] = int(record['id'])
-                    except (ValueError, TypeError):
-                        pass
-                
-                convert_datetime_fields(record)
-            except Exception as e:
-                logger.exception(f'Failed to decrypt soap record {i}: {e}')
-                record['soap_sections'] = {}
         
         return records
     except Exception as e:
         logger.error(f"get_patient_soap_records error: {e}")
         raise Exception(f"Failed to get SOAP records: {e}")
 
-def update_soap_record(record_id: int, soap_sections: Dict) -> bool:
-    """Update SOAP sections for a record."""
+def get_patient_soap_records_page(patient_id: int, continuation: Optional[str] = None,
+                                  page_size: Optional[int] = None,
+                                  fields: Optional[Tuple[str, ...]] = None) -> Tuple[List[Dict], Optional[str]]:
+    """Get one page of a patient's SOAP records plus the continuation token for the next page."""
+    check_db_available()
+    
+    try:
+        container = get_container(CONTAINER_SOAP_RECORDS)
+        parameters = [{"name": "@patient_id", "value": patient_id}]
+        return _query_page(container, _soap_records_query(fields), _decrypt_soap_page, parameters, continuation, page_size)
+    except Exception as e:
+        logger.error(f"get_patient_soap_records_page error: {e}")
+        raise Exception(f"Failed to get SOAP records: {e}")
+
+
+def get_patient_soap_records_summary(patient_id: int) -> List[Dict]:
+    """Get a patient's SOAP records without the encrypted transcript and SOAP fields."""
+    return get_patient_soap_records(patient_id, fields=SOAP_SUMMARY_FIELDS)
+
+
+def get_soap_record_by_id(record_id: int) -> Optional[Dict]:
+    """Get a single decrypted SOAP record, or None if it doesn't exist."""
     check_db_available()
     
     try:
         container = get_container(CONTAINER_SOAP_RECORDS)
-        
         record_id_str = str(record_id)
         
-        
         try:
             record = container.read_item(item=record_id_str, partition_key=record_id_str)
-        except Exception:
-            
-            query = "SELECT * FROM c WHERE c.record_id = @record_id"
-            parameters = [{"name": "@record_id", "value": record_id}]
-            items = list(container.query_items(
-                query=query,
-                parameters=parameters,
-                enable_cross_partition_query=True
-            ))
-            if not items:
-                raise Exception(f"SOAP record {record_id} not found")
-            record = items[0]
-            record_id_str = record['id']  
+        except exceptions.CosmosResourceNotFoundError:
+            return None
         
+        _decrypt_soap_row(record)
+        return record
+    except Exception as e:
+        logger.error(f"get_soap_record_by_id error: {e}")
+        raise Exception(f"Failed to get SOAP record: {e}")
+
+
+def update_soap_record(record_id: int, soap_sections: Dict) -> bool:
+    """Update SOAP sections for a record."""
+    check_db_available()
+    
+    try:
+        container = get_container(CONTAINER_SOAP_RECORDS)
         
-        record['soap_sections'] = encrypt_json(soap_sections)
-        record['updated_at'] = datetime.utcnow().isoformat() + 'Z'
+        record_id_str = str(record_id)
         
         
-        container.replace_item(item=record_id_str, body=record)
+        # Partial update: one round trip, and only the changed fields go over the wire.
+        # The document id is always str(record_id), so a 404 means the record doesn't exist.
+        try:
+            container.patch_item(
+                item=record_id_str,
+                partition_key=record_id_str,
+                patch_operations=[
+                    {'op': 'set', 'path': '/soap_sections', 'value': encrypt_json(soap_sections)},
+                    {'op': 'set', 'path': '/updated_at', 'value': _now_iso()},
+                ]
+            )
+        except exceptions.CosmosResourceNotFoundError:
+            raise Exception(f"SOAP record {record_id} not found")
         
         return True
     except Exception as e:
@@ -500,27 +771,23 @@ def update_soap_record(record_id: int, soap_sections: Dict) -> bool:
         raise Exception(f"Failed to update SOAP record: {e}")
 
 
-def get_voice_recordings(patient_id: int) -> List[Dict]:
-    """Get all voice recordings for a patient."""
+def get_voice_recordings(patient_id: int, fields: Optional[Tuple[str, ...]] = None) -> List[Dict]:
+    """Get all voice recordings for a patient. `fields` limits the projection (see VOICE_RECORDING_FIELDS)."""
     check_db_available()
     
     try:
         container = get_container(CONTAINER_VOICE_RECORDINGS)
         
         patient_id_str = str(patient_id)
-        query = "SELECT * FROM c WHERE c.patient_id = @patient_id ORDER BY c.created_at DESC"
+        select = _select_clause(fields, VOICE_RECORDING_FIELDS)
+        query = f"SELECT {select} FROM c WHERE c.patient_id = @patient_id ORDER BY c.created_at DESC"
         parameters = [{"name": "@patient_id", "value": patient_id_str}]
         
-        items = container.query_items(
+        recordings = list(container.query_items(
             query=query,
             parameters=parameters,
             enable_cross_partition_query=True
-        )
-        
-        recordings = list(items)
-        
-        for recording in recordings:
-            convert_datetime_fields(recording)
+        ))
         
         return recordings
     except Exception as e:
@@ -528,6 +795,28 @@ def get_voice_recordings(patient_id: int) -> List[Dict]:
         raise Exception(f"Failed to get voice recordings: {e}")
 
 
+def _decrypt_user_fields(user: Optional[Dict], fields: Tuple[str, ...]) -> None:
+    """Decrypt the given user fields in place; empty fields are left as they are."""
+    if not user:
+        return
+    _decrypt_fields([user], fields)
+
+
+def _find_user_by_email(email: str) -> Optional[Dict]:
+    """Return the raw (still encrypted) user document for this email, or None."""
+    container = get_container(CONTAINER_LOGGED_USERS)
+    
+    query = "SELECT TOP 1 * FROM c WHERE c.email_hash = @email_hash"
+    parameters = [{"name": "@email_hash", "value": _email_hash(email)[1]}]
+    
+    users = list(container.query_items(
+        query=query,
+        parameters=parameters,
+        enable_cross_partition_query=True
+    ))
+    return users[0] if users else None
+
+
 def create_logged_user(email: str = None, name: str = None) -> Dict:
     """Create a logged user record.
 
@@ -537,13 +826,12 @@ def create_logged_user(email: str = None, name: str = None) -> Dict:
     check_db_available()
     
     user_id = generate_user_id()
-    email_norm = (email or '').strip().lower() if email else ''
-    email_hash = hashlib.sha256(email_norm.encode('utf-8')).hexdigest() if email else None
+    email_hash = _email_hash(email)[1] if email else None
     
     try:
         container = get_container(CONTAINER_LOGGED_USERS)
         
-        created_at = datetime.utcnow().isoformat() + 'Z'
+        created_at = _now_iso()
         
         user_doc = {
             'id': user_id,
@@ -553,18 +841,12 @@ def create_logged_user(email: str = None, name: str = None) -> Dict:
             'created_at': created_at,
         }
         
-        container.create_item(body=user_doc)
+        user = container.create_item(body=user_doc)
         
         logger.info(f"Logged user created with id: {user_id}")
         
-        # Retrieve user
-        user = container.read_item(item=user_id, partition_key=user_id)
-        
         try:
-            if user and user.get('email'):
-                user['email'] = decrypt_text(user['email'])
-            if user and user.get('name'):
-                user['name'] = decrypt_text(user['name'])
+            _decrypt_user_fields(user, ('email', 'name'))
         except Exception:
             logger.exception('Failed to decrypt logged user fields')
         
@@ -578,33 +860,13 @@ def get_logged_user_by_google(email: str) -> Optional[Dict]:
     """Lookup logged user by email hash."""
     check_db_available()
     
-    email_norm = (email or '').strip().lower()
-    email_hash = hashlib.sha256(email_norm.encode('utf-8')).hexdigest()
-    
     try:
-        container = get_container(CONTAINER_LOGGED_USERS)
-        
-        query = "SELECT * FROM c WHERE c.email_hash = @email_hash"
-        parameters = [{"name": "@email_hash", "value": email_hash}]
-        
-        items = container.query_items(
-            query=query,
-            parameters=parameters,
-            enable_cross_partition_query=True
-        )
-        
-        users = list(items)
-        
-        if not users:
+        user = _find_user_by_email(email)
+        if not user:
             return None
         
-        user = users[0]  
-        
         try:
-            if user.get('email'):
-                user['email'] = decrypt_text(user['email'])
-            if user.get('name'):
-                user['name'] = decrypt_text(user['name'])
+            _decrypt_user_fields(user, ('email', 'name'))
         except Exception:
             logger.exception('Failed to decrypt logged user fields')
         
@@ -628,12 +890,11 @@ def create_user(email: str, password_hash: str, name: str = None) -> Dict:
     check_db_available()
 
     user_id = generate_user_id()
-    email_norm = (email or '').strip().lower()
-    email_hash = hashlib.sha256(email_norm.encode('utf-8')).hexdigest()
+    email_hash = _email_hash(email)[1]
 
     try:
         container = get_container(CONTAINER_LOGGED_USERS)
-        created_at = datetime.utcnow().isoformat() + 'Z'
+        created_at = _now_iso()
 
         user_doc = {
             'id': user_id,
@@ -646,16 +907,11 @@ def create_user(email: str, password_hash: str, name: str = None) -> Dict:
             'updated_at': created_at,
         }
 
-        container.create_item(body=user_doc)
+        user = container.create_item(body=user_doc)
         logger.info(f"User created with id: {user_id}")
 
-        
-        user = container.read_item(item=user_id, partition_key=user_id)
         try:
-            if user and user.get('email'):
-                user['email'] = decrypt_text(user['email'])
-            if user and user.get('name'):
-                user['name'] = decrypt_text(user['name'])
+            _decrypt_user_fields(user, ('email', 'name'))
         except Exception:
             logger.exception('Failed to decrypt user fields')
         return user
@@ -667,30 +923,13 @@ def create_user(email: str, password_hash: str, name: str = None) -> Dict:
 def get_user_by_email(email: str) -> Optional[Dict]:
     """Lookup user by email hash."""
     check_db_available()
-    email_norm = (email or '').strip().lower()
-    email_hash = hashlib.sha256(email_norm.encode('utf-8')).hexdigest()
 
     try:
-        container = get_container(CONTAINER_LOGGED_USERS)
-        query = "SELECT * FROM c WHERE c.email_hash = @email_hash"
-        parameters = [{"name": "@email_hash", "value": email_hash}]
-
-        items = container.query_items(
-            query=query,
-            parameters=parameters,
-            enable_cross_partition_query=True
-        )
-        users = list(items)
-        if not users:
+        user = _find_user_by_email(email)
+        if not user:
             return None
-        user = users[0]
         try:
-            if user.get('email'):
-                user['email'] = decrypt_text(user['email'])
-            if user.get('password_hash'):
-                user['password_hash'] = decrypt_text(user['password_hash'])
-            if user.get('name'):
-                user['name'] = decrypt_text(user['name'])
+            _decrypt_user_fields(user, ('email', 'password_hash', 'name'))
         except Exception:
             logger.exception('Failed to decrypt user fields')
         return user
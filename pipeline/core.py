@@ -1,9 +1,16 @@
-
+import asyncio
 import logging
 from typing import List, Tuple, Dict, Optional
+from agent.config import logger
 from pipeline.audio_utils import ensure_wav, transcribe_with_deepgram
 
-from pipeline.gemini_llm import generate_soap, correct_diarization
+from pipeline.gemini_llm import (
+    generate_soap,
+    correct_diarization,
+    correct_and_soap,
+    generate_soap_async,
+    correct_diarization_async,
+)
 
 
 class MedicalAudioProcessor:
@@ -14,10 +21,46 @@ class MedicalAudioProcessor:
         return ensure_wav(audio_path)
 
     def transcribe_file(self, audio_path: str, beam_size: int = 5):
-    
+
         return transcribe_with_deepgram(audio_path, diarize=True)
     def generate_soap(self, transcript: str) -> str:
         return generate_soap(transcript)
-    
+
     def correct_diarization(self, transcript: str) -> str:
-        return correct_diarization(transcript)
\ No newline at end of file
+        return correct_diarization(transcript)
+
+    def correct_and_soap(self, transcript: str) -> Tuple[str, Dict]:
+        return correct_and_soap(transcript)
+
+    async def process_many(self, audio_paths: List[str], correct: bool = False,
+                           max_concurrent: int = 5) -> List[Dict]:
+        """
+        Transcribe and summarize several recordings concurrently, at most
+        `max_concurrent` at a time. Results come back in input order; a file
+        that fails to transcribe gets an 'error' entry instead of failing the batch.
+        """
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def process_one(audio_path: str) -> Dict:
+            async with semaphore:
+                try:
+                    # Deepgram's client is synchronous, so keep it off the event loop
+                    transcript, segments = await asyncio.to_thread(self.transcribe_file, audio_path)
+                    if not transcript:
+                        return {"audio_path": audio_path, "error": "Failed to transcribe audio."}
+
+                    corrected = await correct_diarization_async(transcript) if correct else transcript
+                    soap_sections = await generate_soap_async(corrected)
+                except Exception as e:
+                    # transcribe_file re-raises once Deepgram's retries run out
+                    logger.error("Processing %s failed: %s", audio_path, e)
+                    return {"audio_path": audio_path, "error": str(e)}
+                return {
+                    "audio_path": audio_path,
+                    "transcript": corrected,
+                    "original_transcript": transcript if correct else None,
+                    "diarized_segments": segments,
+                    "soap_sections": soap_sections,
+                }
+
+        return await asyncio.gather(*(process_one(path) for path in audio_paths))
@@ -1,28 +1,51 @@
 import os
 import logging
-import google.generativeai as genai
-from dotenv import load_dotenv
+import functools
+from utils.env import load_env
 import json
 import re
-from typing import Dict, Tuple, Optional
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Optional
+from google.api_core import exceptions as google_exceptions
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 from agent.config import logger, GEMINI_API_KEY
 
-load_dotenv()
+# orjson parses SOAP payloads in C; fall back to the stdlib where it isn't installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    _json_loads = json.loads
+    _JSONDecodeError = json.JSONDecodeError
+
+load_env()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=GEMINI_API_KEY)
 
 # Use best available Gemini model
 GEMINI_MODEL_NAME = "gemini-2.5-flash"  # Latest and most capable
-gemini_model = genai.GenerativeModel(
-    GEMINI_MODEL_NAME,
-    generation_config={
-        "temperature": 0,  # Deterministic for medical accuracy
-        "top_p": 0.95,
-        "top_k": 40,
-        "max_output_tokens": 8192,
-    }
-)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_model():
+    """Configure the SDK and build the Gemini model on first use, not at import."""
+    import google.generativeai as genai
+
+    genai.configure(api_key=GEMINI_API_KEY)
+    return genai.GenerativeModel(
+        GEMINI_MODEL_NAME,
+        generation_config={
+            "temperature": 0,  # Deterministic for medical accuracy
+            "top_p": 0.95,
+            "top_k": 40,
+            "max_output_tokens": 8192,
+        }
+    )
 
 # ============================================================================
 # RESEARCH-BACKED PROMPTS
@@ -155,10 +178,83 @@ IMPORTANT REMINDERS:
 ### SOAP Note JSON:
 """
 
+# FUSED PROMPT: speaker correction and SOAP note in one call, so the transcript is read once
+CORRECT_AND_SOAP_PROMPT = """You are an expert medical transcription and documentation assistant. Process the doctor-patient conversation below in two steps and return ONE JSON object.
+
+STEP 1 - CORRECT SPEAKER LABELS:
+- "Doctor:" asks questions, uses medical terminology, provides diagnoses and treatment plans
+- "Patient:" describes symptoms, answers questions, expresses concerns
+- Fix words at the start of a response attributed to the previous speaker, misattributed short acknowledgments ("yes", "okay"), and question words separated from the rest of the question
+- Only move words to the correct speaker - do NOT change, add, remove or reorder any words
+- Example: "Doctor: What brings you in today? I've / Patient: been having chest pain." becomes "Doctor: What brings you in today? / Patient: I've been having chest pain."
+
+STEP 2 - WRITE THE SOAP NOTE FROM THE CORRECTED TRANSCRIPT:
+1. Extract information ONLY from the conversation provided - do NOT invent or assume any details
+2. Use proper medical terminology and standard abbreviations (HTN, DM, GERD, etc.)
+3. Do NOT use markdown, bullet points, or special formatting within the sections
+4. Be concise but complete - capture ALL clinically relevant information
+5. If information is not mentioned, write "Not discussed" (do NOT use "N/A")
+
+SOAP NOTE STRUCTURE:""" + SOAP_GENERATION_PROMPT.split("SOAP NOTE STRUCTURE:", 1)[1].split("IMPORTANT REMINDERS:", 1)[0] + """IMPORTANT REMINDERS:
+- Use clinical abbreviations appropriately (PO, PRN, q6h, BID, etc.)
+- Be specific about laterality (left/right) and exact locations
+- Include dosages and frequencies for all medications
+- Do NOT include information not in the conversation
+- Do NOT add disclaimers or meta-commentary
+
+OUTPUT RULES:
+- Return exactly ONE JSON object with exactly two keys: "corrected_transcript" and "soap"
+- "corrected_transcript" is a string holding the full transcript with corrected labels, one speaker turn per line
+- "soap" is an object with exactly these keys: Subjective, Objective, Assessment, Plan
+- No text before or after the JSON object
+
+### Doctor-Patient Conversation:
+{transcript}
+
+### Output Format (JSON only):
+```json
+{{
+    "corrected_transcript": "Doctor: ...\\nPatient: ...",
+    "soap": {{
+        "Subjective": "Patient reports...",
+        "Objective": "Vital signs: BP 120/80...",
+        "Assessment": "Primary diagnosis: ...",
+        "Plan": "1. Medication: ... 2. Follow-up: ..."
+    }}
+}}
+```
+
+### JSON:
+"""
+
 # ============================================================================
 # CORE FUNCTIONS WITH VALIDATION
 # ============================================================================
 
+_WS_RE = re.compile(r'\s+')
+
+# Common ASR errors in medical terms: correct spelling -> misrecognitions
+MEDICAL_CORRECTIONS = {
+    'hypertension': ['high pertension', 'hyper tension'],
+    'diabetes mellitus': ['diabete smellitus', 'diabetus', 'diabetes mellitas'],
+    'myocardial infarction': ['myocardial in fraction'],
+    'prescription': ['perscription'],
+    'medication': ['mediction'],
+    'symptoms': ['symptom', 'simptoms'],
+    'diagnosis': ['diagnoses', 'diagnosys'],
+}
+_ASR_MAP = {error: correct for correct, errors in MEDICAL_CORRECTIONS.items() for error in errors}
+# Longest first, so an alternative never shadows a longer misspelling it prefixes
+_ASR_PATTERN = re.compile(
+    '|'.join(re.escape(error) for error in sorted(_ASR_MAP, key=len, reverse=True)),
+    re.IGNORECASE
+)
+
+
+def _asr_replacement(match: re.Match) -> str:
+    return _ASR_MAP[match.group(0).lower()]
+
+
 def preprocess_transcript(transcript: str) -> str:
     """
     Clean and normalize transcript before processing.
@@ -169,56 +265,76 @@ def preprocess_transcript(transcript: str) -> str:
         return transcript
     
     # Remove extra whitespace
-    transcript = ' '.join(transcript.split())
-    
-    # Fix common ASR errors in medical terms
-    medical_corrections = {
-        'hypertension': ['high pertension', 'hyper tension'],
-        'diabetes mellitus': ['diabete smellitus', 'diabetus', 'diabetes mellitas'],
-        'myocardial infarction': ['myocardial in fraction'],
-        'prescription': ['perscription'],
-        'medication': ['mediction'],
-        'symptoms': ['symptom', 'simptoms'],
-        'diagnosis': ['diagnoses', 'diagnosys'],
-    }
-    
-    transcript_lower = transcript.lower()
-    for correct, errors in medical_corrections.items():
-        for error in errors:
-            if error in transcript_lower:
-                # Case-insensitive replacement
-                pattern = re.compile(re.escape(error), re.IGNORECASE)
-                transcript = pattern.sub(correct, transcript)
+    transcript = _WS_RE.sub(' ', transcript).strip()
     
-    return transcript
+    # Fix common ASR errors in medical terms in one case-insensitive pass
+    return _ASR_PATTERN.sub(_asr_replacement, transcript)
 
 
-def validate_speaker_labels(transcript: str) -> bool:
-    """
-    Validate that transcript has proper speaker labels.
-    Returns True if valid, False otherwise.
-    """
+def _speaker_counts(transcript: str) -> Tuple[int, int]:
+    """Count (Doctor:, Patient:) labels case-insensitively on a single lowercased copy."""
+    lowered = transcript.lower()
+    return lowered.count('doctor:'), lowered.count('patient:')
+
+
+def _check_speaker_labels(transcript: str) -> Tuple[bool, int, int]:
+    """Return (is_valid, doctor_count, patient_count) so callers can reuse the counts."""
     if not transcript or not transcript.strip():
-        return False
+        return False, 0, 0
     
-    # Check for presence of speaker labels
-    has_doctor = 'Doctor:' in transcript or 'doctor:' in transcript
-    has_patient = 'Patient:' in transcript or 'patient:' in transcript
+    doctor_count, patient_count = _speaker_counts(transcript)
     
-    if not (has_doctor or has_patient):
+    if not (doctor_count or patient_count):
         logger.warning("Transcript missing speaker labels (Doctor:/Patient:)")
-        return False
-    
-    # Count speaker turns
-    doctor_count = transcript.lower().count('doctor:')
-    patient_count = transcript.lower().count('patient:')
+        return False, 0, 0
     
     if doctor_count == 0 or patient_count == 0:
-        logger.warning(f"Imbalanced speakers: Doctor={doctor_count}, Patient={patient_count}")
-        return False
+        logger.warning("Imbalanced speakers: Doctor=%s, Patient=%s", doctor_count, patient_count)
+        return False, doctor_count, patient_count
     
-    logger.info(f"Transcript validation: Doctor turns={doctor_count}, Patient turns={patient_count}")
-    return True
+    logger.info("Transcript validation: Doctor turns=%s, Patient turns=%s", doctor_count, patient_count)
+    return True, doctor_count, patient_count
+
+
+def validate_speaker_labels(transcript: str) -> bool:
+    """
+    Validate that transcript has proper speaker labels.
+    Returns True if valid, False otherwise.
+    """
+    return _check_speaker_labels(transcript)[0]
+
+
+_WORD_RE = re.compile(r'\b\w+\b')
+
+
+_TURN_RE = re.compile(r'\b(doctor|patient):', re.IGNORECASE)
+_TURN_END = ('.', '?', '!', '"', "'")
+
+# Skipping correction for transcripts that look clean is opt-in: Deepgram turns
+# nearly always end in punctuation, and a misattributed "Yes." after a question
+# looks structurally fine, so the check can only rule out trivial transcripts
+SKIP_CLEAN_TRANSCRIPT_CORRECTION = os.getenv('GEMINI_SKIP_CLEAN_CORRECTION') == '1'
+_TRIVIAL_MAX_TURNS = 4
+
+
+def _likely_needs_correction(transcript: str) -> bool:
+    """
+    Cheap structural check for the errors the correction prompt fixes.
+    Only a provably trivial transcript counts as clean: a few alternating turns,
+    each ending a sentence, and no question/answer boundary where a short
+    acknowledgment could sit on the wrong side.
+    """
+    parts = _TURN_RE.split(transcript)
+    # parts = [text before first label, label, text, label, text, ...]
+    if parts[0].strip():
+        return True
+    labels = [label.lower() for label in parts[1::2]]
+    turns = [turn.strip() for turn in parts[2::2]]
+    if len(turns) > _TRIVIAL_MAX_TURNS or '?' in transcript:
+        return True
+    if any(previous == current for previous, current in zip(labels, labels[1:])):
+        return True
+    return any(not turn.endswith(_TURN_END) for turn in turns[:-1])
 
 
 def validate_correction(original: str, corrected: str) -> Tuple[bool, str]:
@@ -227,19 +343,22 @@ def validate_correction(original: str, corrected: str) -> Tuple[bool, str]:
     Returns (is_valid, error_message).
     """
     # Extract words (ignore speaker tags and punctuation)
-    orig_words = re.findall(r'\b\w+\b', original.lower())
-    corr_words = re.findall(r'\b\w+\b', corrected.lower())
+    orig_words = _WORD_RE.findall(original.lower())
+    corr_words = _WORD_RE.findall(corrected.lower())
     
-    # Words should be identical (order matters)
+    # Words should be identical (order matters); sets are only built for the error message
     if orig_words != corr_words:
-        missing = set(orig_words) - set(corr_words)
-        added = set(corr_words) - set(orig_words)
-        error = f"Word mismatch - Missing: {missing}, Added: {added}"
+        orig_set, corr_set = set(orig_words), set(corr_words)
+        error = f"Word mismatch - Missing: {orig_set - corr_set}, Added: {corr_set - orig_set}"
         return False, error
     
     return True, ""
 
 
+_JSON_BLOCK_RE = re.compile(r'```json\s*(.*?)\s*```', re.DOTALL)
+_JSON_OBJ_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+
 def clean_json_response(text: str) -> str:
     """
     Extract clean JSON from LLM response.
@@ -250,7 +369,7 @@ def clean_json_response(text: str) -> str:
     # Remove markdown code blocks
     if '```json' in text:
         # Extract content between ```json and ```
-        match = re.search(r'```json\s*(.*?)\s*```', text, re.DOTALL)
+        match = _JSON_BLOCK_RE.search(text)
         if match:
             text = match.group(1).strip()
     elif text.startswith('```'):
@@ -263,7 +382,7 @@ def clean_json_response(text: str) -> str:
         text = '\n'.join(lines).strip()
     
     # Try to extract JSON object if there's surrounding text
-    json_match = re.search(r'\{.*\}', text, re.DOTALL)
+    json_match = _JSON_OBJ_RE.search(text)
     if json_match:
         text = json_match.group(0)
     
@@ -280,14 +399,14 @@ def validate_soap_json(soap_dict: Dict) -> Tuple[bool, Dict]:
     # Ensure all keys exist
     for key in required_keys:
         if key not in soap_dict:
-            logger.warning(f"Missing SOAP key: {key}, adding placeholder")
+            logger.warning("Missing SOAP key: %s, adding placeholder", key)
             soap_dict[key] = "Not discussed"
     
     # Check for empty or invalid values
     for key in required_keys:
         value = soap_dict[key]
         if not value or not isinstance(value, str) or value.strip() == "":
-            logger.warning(f"Empty SOAP section: {key}, using placeholder")
+            logger.warning("Empty SOAP section: %s, using placeholder", key)
             soap_dict[key] = "Not discussed"
         elif value.strip().lower() in ["n/a", "na", "none"]:
             # Replace generic placeholders with more informative text
@@ -296,7 +415,7 @@ def validate_soap_json(soap_dict: Dict) -> Tuple[bool, Dict]:
     # Validate each section has reasonable content
     for key in required_keys:
         if len(soap_dict[key]) < 10 and soap_dict[key] != "Not discussed":
-            logger.warning(f"Suspiciously short {key} section: {soap_dict[key]}")
+            logger.warning("Suspiciously short %s section: %s", key, soap_dict[key])
     
     return True, soap_dict
 
@@ -305,6 +424,150 @@ def validate_soap_json(soap_dict: Dict) -> Tuple[bool, Dict]:
 # MAIN API FUNCTIONS
 # ============================================================================
 
+# Both calls want deterministic output and the same token budget
+_LLM_GENERATION_CONFIG = {
+    "temperature": 0,  # Deterministic for medical accuracy
+    "max_output_tokens": 4096,
+}
+# The fused call echoes the whole transcript before the SOAP note, so it gets the
+# model's full output budget
+_FUSED_GENERATION_CONFIG = {**_LLM_GENERATION_CONFIG, "max_output_tokens": 8192}
+MAX_RETRIES = 2
+
+# Opt-in exact-match cache of Gemini results keyed on the full prompt, so a template
+# change is a new key. Off by default: every visit's transcript is unique, so hits are
+# rare, and entries hold transcripts and SOAP notes (PHI) in memory. When enabled,
+# entries expire after GEMINI_RESPONSE_CACHE_TTL seconds.
+RESPONSE_CACHE_SIZE = int(os.getenv("GEMINI_RESPONSE_CACHE_SIZE", "0"))
+RESPONSE_CACHE_TTL = float(os.getenv("GEMINI_RESPONSE_CACHE_TTL", "300"))
+_response_cache: "OrderedDict[str, Tuple[float, object]]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+
+def _cache_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def _cache_get(key: str):
+    if RESPONSE_CACHE_SIZE <= 0:
+        return None
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del _response_cache[key]
+            return None
+        _response_cache.move_to_end(key)
+    # Hand out copies so callers can't mutate the cached SOAP dict
+    return dict(value) if isinstance(value, dict) else value
+
+
+def _cache_put(key: str, value) -> None:
+    if RESPONSE_CACHE_SIZE <= 0:
+        return
+    with _response_cache_lock:
+        _response_cache[key] = (time.monotonic() + RESPONSE_CACHE_TTL,
+                                dict(value) if isinstance(value, dict) else value)
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
+
+def _chunk_text(chunk) -> str:
+    # Chunks without text parts (e.g. the final usage-only chunk) raise on .text
+    try:
+        return chunk.text
+    except ValueError:
+        return ''
+
+
+# Rate limits and transient server errors back off with jitter instead of retrying
+# immediately; anything else (bad request, safety block) fails straight away
+_TRANSIENT_GEMINI_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+    TimeoutError,
+)
+_gemini_retry = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential_jitter(initial=1, max=10),
+    retry=retry_if_exception_type(_TRANSIENT_GEMINI_ERRORS),
+    reraise=True,
+)
+
+
+@_gemini_retry
+def _generate_text(prompt: str, generation_config: Dict = _LLM_GENERATION_CONFIG) -> str:
+    """Stream a Gemini completion and return the full text, so receiving overlaps generation."""
+    response = _get_model().generate_content(prompt, generation_config=generation_config, stream=True)
+    return ''.join([_chunk_text(chunk) for chunk in response])
+
+
+@_gemini_retry
+async def _generate_text_async(prompt: str) -> str:
+    response = await _get_model().generate_content_async(prompt, generation_config=_LLM_GENERATION_CONFIG, stream=True)
+    return ''.join([_chunk_text(chunk) async for chunk in response])
+
+
+def _prepare_diarization(transcript: str) -> Optional[Tuple[str, str, int]]:
+    """
+    Return (preprocessed transcript, prompt, speaker turns in the original),
+    or None when correction should be skipped.
+    """
+    if not transcript or not transcript.strip():
+        logger.warning("Empty transcript provided for diarization correction")
+        return None
+    
+    # Validate input has speaker labels
+    is_valid, doctor_count, patient_count = _check_speaker_labels(transcript)
+    if not is_valid:
+        logger.warning("Transcript lacks proper speaker labels, skipping correction")
+        return None
+    
+    if SKIP_CLEAN_TRANSCRIPT_CORRECTION and not _likely_needs_correction(transcript):
+        logger.info("Speaker turns already look clean, skipping LLM correction")
+        return None
+    
+    # Preprocess for better accuracy
+    transcript = preprocess_transcript(transcript)
+    
+    # Generate prompt
+    prompt = DIARIZATION_CORRECTION_PROMPT.format(transcript=transcript)
+    
+    logger.info("🔧 Correcting diarization - Input length: %s chars", len(transcript))
+    logger.debug("Diarization prompt (first 500 chars): %s...", prompt[:500])
+    return transcript, prompt, doctor_count + patient_count
+
+
+def _finish_correction(transcript: str, text: str, orig_switches: int) -> Optional[str]:
+    """Validate a Gemini correction; return None if any word changed so callers fall back."""
+    corrected = text.strip()
+    logger.debug("Raw Gemini response (first 300 chars): %s...", corrected[:300])
+    
+    # Clean up response (remove markdown, explanations, etc.)
+    corrected = clean_json_response(corrected) if '```' in corrected else corrected
+    
+    # Validate correction didn't change words
+    is_valid, error = validate_correction(transcript, corrected)
+    if not is_valid:
+        logger.warning("Correction validation failed: %s", error)
+        logger.warning("Using original transcript")
+        return None
+    
+    # Success!
+    logger.info("✅ Diarization correction successful")
+    
+    # Log improvement metrics
+    corr_switches = sum(_speaker_counts(corrected))
+    logger.info("📊 Speaker turns - Original: %s, Corrected: %s", orig_switches, corr_switches)
+    
+    return corrected
+
+
 def correct_diarization(transcript: str) -> str:
     """
     Correct speaker diarization errors using proven few-shot prompting.
@@ -320,77 +583,137 @@ def correct_diarization(transcript: str) -> str:
     Returns:
         Corrected transcript with accurate speaker labels
     """
-    if not transcript or not transcript.strip():
-        logger.warning("Empty transcript provided for diarization correction")
+    prepared = _prepare_diarization(transcript)
+    if prepared is None:
         return transcript
+    original_transcript = transcript
+    transcript, prompt, orig_switches = prepared
+    key = _cache_key(prompt)
+    cached = _cache_get(key)
+    if cached is not None:
+        logger.info("✅ Diarization correction served from cache")
+        return cached
     
-    # Validate input has speaker labels
-    if not validate_speaker_labels(transcript):
-        logger.warning("Transcript lacks proper speaker labels, skipping correction")
+    try:
+        # Transient API errors are retried with backoff inside _generate_text;
+        # this loop only retries empty or unusable output
+        for attempt in range(MAX_RETRIES):
+            text = _generate_text(prompt)
+            
+            if not text:
+                logger.warning("Empty response from Gemini (attempt %s/%s)", attempt + 1, MAX_RETRIES)
+                continue
+            
+            corrected = _finish_correction(transcript, text, orig_switches)
+            if corrected is None:
+                return original_transcript
+            # Only validated corrections are cached so a rejected one gets a fresh attempt
+            _cache_put(key, corrected)
+            return corrected
+        
+        # If all retries failed
+        logger.warning("All diarization correction attempts failed, using original")
+        return original_transcript
+        
+    except Exception as e:
+        logger.error("❌ Diarization correction failed: %s", e, exc_info=True)
+        return original_transcript  # Fallback to original
+
+
+async def correct_diarization_async(transcript: str) -> str:
+    """Async counterpart of correct_diarization; awaits Gemini instead of blocking a thread."""
+    prepared = _prepare_diarization(transcript)
+    if prepared is None:
         return transcript
-    
-    # Preprocess for better accuracy
     original_transcript = transcript
+    transcript, prompt, orig_switches = prepared
+    key = _cache_key(prompt)
+    cached = _cache_get(key)
+    if cached is not None:
+        logger.info("✅ Diarization correction served from cache")
+        return cached
+    
+    try:
+        # Transient API errors are retried with backoff inside _generate_text_async;
+        # this loop only retries empty or unusable output
+        for attempt in range(MAX_RETRIES):
+            text = await _generate_text_async(prompt)
+            
+            if not text:
+                logger.warning("Empty response from Gemini (attempt %s/%s)", attempt + 1, MAX_RETRIES)
+                continue
+            
+            corrected = _finish_correction(transcript, text, orig_switches)
+            if corrected is None:
+                return original_transcript
+            # Only validated corrections are cached so a rejected one gets a fresh attempt
+            _cache_put(key, corrected)
+            return corrected
+        
+        logger.warning("All diarization correction attempts failed, using original")
+        return original_transcript
+        
+    except Exception as e:
+        logger.error("❌ Diarization correction failed: %s", e, exc_info=True)
+        return original_transcript
+
+
+def _prepare_soap(transcript: str) -> Optional[str]:
+    """Return the SOAP prompt for a transcript, or None if it is empty."""
+    if not transcript or not transcript.strip():
+        logger.warning("Empty transcript provided for SOAP generation")
+        return None
+    
+    # Preprocess transcript
     transcript = preprocess_transcript(transcript)
     
     # Generate prompt
-    prompt = DIARIZATION_CORRECTION_PROMPT.format(transcript=transcript)
+    prompt = SOAP_GENERATION_PROMPT.format(transcript=transcript)
     
-    logger.info(f"🔧 Correcting diarization - Input length: {len(transcript)} chars")
-    logger.debug(f"Diarization prompt (first 500 chars): {prompt[:500]}...")
+    logger.info("📝 Generating SOAP note - Input length: %s chars", len(transcript))
+    logger.debug("SOAP prompt (first 500 chars): %s...", prompt[:500])
+    return prompt
+
+
+def _parse_soap_text(text: str, attempt: int) -> Optional[Tuple[dict, bool]]:
+    """
+    Turn a Gemini response into (SOAP dict, complete), where complete is False
+    for salvaged partial notes. Returns None when the attempt should be retried;
+    raises on the last attempt.
+    """
+    text = text.strip()
+    logger.debug("Raw Gemini response (first 300 chars): %s...", text[:300])
+    
+    # Clean and extract JSON
+    text = clean_json_response(text)
     
+    # Parse JSON
     try:
-        # Call Gemini with retry logic
-        max_retries = 2
-        for attempt in range(max_retries):
-            try:
-                response = gemini_model.generate_content(
-                    prompt,
-                    generation_config={
-                        "temperature": 0,  # Deterministic for consistency
-                        "max_output_tokens": 4096,
-                    }
-                )
-                
-                if not response or not response.text:
-                    logger.warning(f"Empty response from Gemini (attempt {attempt + 1}/{max_retries})")
-                    continue
-                
-                corrected = response.text.strip()
-                logger.debug(f"Raw Gemini response (first 300 chars): {corrected[:300]}...")
-                
-                # Clean up response (remove markdown, explanations, etc.)
-                corrected = clean_json_response(corrected) if '```' in corrected else corrected
-                
-                # Validate correction didn't change words
-                is_valid, error = validate_correction(transcript, corrected)
-                if not is_valid:
-                    logger.warning(f"Correction validation failed: {error}")
-                    logger.warning("Using original transcript")
-                    return original_transcript
-                
-                # Success!
-                logger.info("✅ Diarization correction successful")
-                
-                # Log improvement metrics
-                orig_switches = original_transcript.count('Doctor:') + original_transcript.count('Patient:')
-                corr_switches = corrected.count('Doctor:') + corrected.count('Patient:')
-                logger.info(f"📊 Speaker turns - Original: {orig_switches}, Corrected: {corr_switches}")
-                
-                return corrected
-                
-            except Exception as e:
-                logger.warning(f"Attempt {attempt + 1} failed: {e}")
-                if attempt == max_retries - 1:
-                    raise
+        result = _json_loads(text)
+        logger.debug("Parsed JSON keys: %s", list(result.keys()))
         
-        # If all retries failed
-        logger.warning("All diarization correction attempts failed, using original")
-        return original_transcript
+        # Validate and fix structure
+        is_valid, result = validate_soap_json(result)
         
-    except Exception as e:
-        logger.error(f"❌ Diarization correction failed: {e}", exc_info=True)
-        return original_transcript  # Fallback to original
+        if is_valid:
+            logger.info("✅ SOAP note generated successfully")
+            _log_soap_metrics(result)
+            return result, True
+        
+    except _JSONDecodeError as je:
+        logger.warning("JSON parse error (attempt %s): %s", attempt + 1, je)
+        logger.debug("Problematic JSON: %s...", text[:500])
+        
+        # Try to salvage partial JSON
+        result = _salvage_json(text)
+        if result:
+            logger.info("⚠️ SOAP note generated with partial salvage")
+            return result, False
+        
+        if attempt == MAX_RETRIES - 1:
+            raise
+    
+    return None
 
 
 def generate_soap(transcript: str) -> dict:
@@ -408,82 +731,178 @@ def generate_soap(transcript: str) -> dict:
     Returns:
         Dictionary with keys: Subjective, Objective, Assessment, Plan
     """
-    if not transcript or not transcript.strip():
-        logger.warning("Empty transcript provided for SOAP generation")
+    prompt = _prepare_soap(transcript)
+    if prompt is None:
         return _empty_soap_note()
-    
-    # Preprocess transcript
-    transcript = preprocess_transcript(transcript)
-    
-    # Generate prompt
-    prompt = SOAP_GENERATION_PROMPT.format(transcript=transcript)
-    
-    logger.info(f"📝 Generating SOAP note - Input length: {len(transcript)} chars")
-    logger.debug(f"SOAP prompt (first 500 chars): {prompt[:500]}...")
+    key = _cache_key(prompt)
+    cached = _cache_get(key)
+    if cached is not None:
+        logger.info("✅ SOAP note served from cache")
+        return cached
     
     try:
-        # Call Gemini with retry logic
-        max_retries = 2
-        for attempt in range(max_retries):
-            try:
-                response = gemini_model.generate_content(
-                    prompt,
-                    generation_config={
-                        "temperature": 0,  # Deterministic for medical accuracy
-                        "max_output_tokens": 4096,
-                    }
-                )
-                
-                if not response or not response.text:
-                    logger.warning(f"Empty response from Gemini (attempt {attempt + 1}/{max_retries})")
-                    continue
-                
-                text = response.text.strip()
-                logger.debug(f"Raw Gemini response (first 300 chars): {text[:300]}...")
-                
-                # Clean and extract JSON
-                text = clean_json_response(text)
-                
-                # Parse JSON
-                try:
-                    result = json.loads(text)
-                    logger.debug(f"Parsed JSON keys: {list(result.keys())}")
-                    
-                    # Validate and fix structure
-                    is_valid, result = validate_soap_json(result)
-                    
-                    if is_valid:
-                        logger.info("✅ SOAP note generated successfully")
-                        _log_soap_metrics(result)
-                        return result
-                    
-                except json.JSONDecodeError as je:
-                    logger.warning(f"JSON parse error (attempt {attempt + 1}): {je}")
-                    logger.debug(f"Problematic JSON: {text[:500]}...")
-                    
-                    # Try to salvage partial JSON
-                    result = _salvage_json(text)
-                    if result:
-                        logger.info("⚠️ SOAP note generated with partial salvage")
-                        return result
-                    
-                    if attempt == max_retries - 1:
-                        raise
-                    
-            except Exception as e:
-                logger.warning(f"Attempt {attempt + 1} failed: {e}")
-                if attempt == max_retries - 1:
-                    raise
+        # Transient API errors are retried with backoff inside _generate_text;
+        # this loop only retries empty or unusable output
+        for attempt in range(MAX_RETRIES):
+            text = _generate_text(prompt)
+            
+            if not text:
+                logger.warning("Empty response from Gemini (attempt %s/%s)", attempt + 1, MAX_RETRIES)
+                continue
+            
+            parsed = _parse_soap_text(text, attempt)
+            if parsed is not None:
+                result, complete = parsed
+                # Salvaged notes aren't cached so the next call gets a fresh attempt
+                if complete:
+                    _cache_put(key, result)
+                return result
         
         # If all retries failed
         logger.error("All SOAP generation attempts failed")
         return _empty_soap_note()
         
     except Exception as e:
-        logger.error(f"❌ SOAP generation failed: {e}", exc_info=True)
+        logger.error("❌ SOAP generation failed: %s", e, exc_info=True)
+        return _empty_soap_note()
+
+
+async def generate_soap_async(transcript: str) -> dict:
+    """Async counterpart of generate_soap; awaits Gemini instead of blocking a thread."""
+    prompt = _prepare_soap(transcript)
+    if prompt is None:
+        return _empty_soap_note()
+    key = _cache_key(prompt)
+    cached = _cache_get(key)
+    if cached is not None:
+        logger.info("✅ SOAP note served from cache")
+        return cached
+    
+    try:
+        # Transient API errors are retried with backoff inside _generate_text_async;
+        # this loop only retries empty or unusable output
+        for attempt in range(MAX_RETRIES):
+            text = await _generate_text_async(prompt)
+            
+            if not text:
+                logger.warning("Empty response from Gemini (attempt %s/%s)", attempt + 1, MAX_RETRIES)
+                continue
+            
+            parsed = _parse_soap_text(text, attempt)
+            if parsed is not None:
+                result, complete = parsed
+                # Salvaged notes aren't cached so the next call gets a fresh attempt
+                if complete:
+                    _cache_put(key, result)
+                return result
+        
+        logger.error("All SOAP generation attempts failed")
+        return _empty_soap_note()
+        
+    except Exception as e:
+        logger.error("❌ SOAP generation failed: %s", e, exc_info=True)
         return _empty_soap_note()
 
 
+def _parse_fused_text(text: str, transcript: str, original_transcript: str,
+                      orig_switches: int) -> Optional[Tuple[str, dict, bool]]:
+    """
+    Split a fused response into (transcript, SOAP dict, complete); None if it is unusable.
+    complete is False when the correction was rejected or the SOAP note failed validation.
+    """
+    try:
+        payload = _json_loads(clean_json_response(text.strip()))
+    except _JSONDecodeError as je:
+        logger.warning("Fused JSON parse error: %s", je)
+        return None
+    
+    corrected = payload.get('corrected_transcript') if isinstance(payload, dict) else None
+    soap = payload.get('soap') if isinstance(payload, dict) else None
+    if not isinstance(corrected, str) or not isinstance(soap, dict):
+        logger.warning("Fused response missing corrected_transcript or soap")
+        return None
+    
+    # Same guarantees as the two-step path: no word changes, complete SOAP sections
+    corrected = _finish_correction(transcript, corrected, orig_switches)
+    soap_valid, soap = validate_soap_json(soap)
+    _log_soap_metrics(soap)
+    if corrected is None:
+        return original_transcript, soap, False
+    return corrected, soap, soap_valid
+
+
+def correct_and_soap(transcript: str) -> Tuple[str, dict]:
+    """
+    Correct speaker labels and generate the SOAP note with a single Gemini call.
+    Returns (corrected transcript, SOAP dict). Transcripts that don't need correction
+    go straight to generate_soap; an unusable fused response falls back to the
+    two-step correct_diarization -> generate_soap path.
+    """
+    prepared = _prepare_diarization(transcript)
+    if prepared is None:
+        return transcript, generate_soap(transcript)
+    original_transcript = transcript
+    transcript, _, orig_switches = prepared
+    
+    prompt = CORRECT_AND_SOAP_PROMPT.format(transcript=transcript)
+    key = _cache_key(prompt)
+    cached = _cache_get(key)
+    if cached is not None:
+        logger.info("✅ Corrected transcript and SOAP note served from cache")
+        return cached['corrected_transcript'], dict(cached['soap'])
+    
+    logger.info("🔧📝 Correcting diarization and generating SOAP in one call - Input length: %s chars", len(transcript))
+    # One attempt only: the prompt is deterministic, so re-sending it after an empty,
+    # truncated or unparseable response would just repeat the failure
+    try:
+        text = _generate_text(prompt, _FUSED_GENERATION_CONFIG)
+        parsed = _parse_fused_text(text, transcript, original_transcript, orig_switches) if text else None
+        if parsed is not None:
+            corrected, soap, complete = parsed
+            if complete:
+                _cache_put(key, {'corrected_transcript': corrected, 'soap': dict(soap)})
+            return corrected, soap
+        logger.warning("Fused response was empty or unusable")
+    except Exception as e:
+        logger.warning("Fused correction + SOAP call failed: %s", type(e).__name__)
+    
+    logger.warning("Falling back to separate correction and SOAP calls")
+    corrected = correct_diarization(original_transcript)
+    return corrected, generate_soap(corrected)
+
+
+# Concurrent Gemini requests per batch call; keeps bulk jobs under the per-minute quota
+BATCH_MAX_WORKERS = int(os.getenv("GEMINI_BATCH_MAX_WORKERS", "5"))
+
+
+def _run_batch(func, transcripts: List[str], max_workers: Optional[int]) -> list:
+    """Apply `func` to each transcript concurrently, returning results in input order."""
+    if not transcripts:
+        return []
+    workers = min(max_workers or BATCH_MAX_WORKERS, len(transcripts))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gemini-batch") as executor:
+        return list(executor.map(func, transcripts))
+
+
+def correct_diarization_batch(transcripts: List[str], max_workers: Optional[int] = None) -> List[str]:
+    """
+    Correct speaker labels for many transcripts at once.
+    Each item goes through correct_diarization, so failures fall back to the
+    original transcript per item exactly as in the single-call path.
+    """
+    logger.info("🔧 Correcting diarization for %s transcripts", len(transcripts))
+    return _run_batch(correct_diarization, transcripts, max_workers)
+
+
+def generate_soap_batch(transcripts: List[str], max_workers: Optional[int] = None) -> List[dict]:
+    """
+    Generate SOAP notes for many transcripts at once, in input order.
+    Interactive requests should keep using generate_soap; this is for bulk jobs.
+    """
+    logger.info("📝 Generating SOAP notes for %s transcripts", len(transcripts))
+    return _run_batch(generate_soap, transcripts, max_workers)
+
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -498,32 +917,39 @@ def _empty_soap_note() -> dict:
     }
 
 
+_SALVAGE_RES = {
+    section: re.compile(rf'"{section}"\s*:\s*"([^"]*)"', re.DOTALL)
+    for section in ("Subjective", "Objective", "Assessment", "Plan")
+}
+
+
 def _salvage_json(text: str) -> Optional[dict]:
     """
     Attempt to salvage partial or malformed JSON.
-    Returns dict if successful, None otherwise.
+    Returns dict if at least one section was recovered, None otherwise.
     """
     try:
         # Try to find key-value pairs even if JSON is malformed
         result = {}
+        found_count = 0
         
         # Look for each SOAP section
-        sections = ["Subjective", "Objective", "Assessment", "Plan"]
-        for section in sections:
+        for section, pattern in _SALVAGE_RES.items():
             # Try to extract content after section name
-            pattern = rf'"{section}"\s*:\s*"([^"]*)"'
-            match = re.search(pattern, text, re.DOTALL)
+            match = pattern.search(text)
             if match:
                 result[section] = match.group(1)
+                found_count += 1
             else:
                 result[section] = "Not discussed"
         
-        if len(result) == 4:
-            logger.info("Successfully salvaged partial JSON")
+        # Four placeholders would hide a total failure from the retry logic
+        if found_count:
+            logger.info("Successfully salvaged partial JSON (%s/%s sections)", found_count, len(_SALVAGE_RES))
             return result
         
     except Exception as e:
-        logger.debug(f"JSON salvage failed: {e}")
+        logger.debug("JSON salvage failed: %s", e)
     
     return None
 
@@ -533,13 +959,13 @@ def _log_soap_metrics(soap_dict: dict):
     for section, content in soap_dict.items():
         char_count = len(content)
         word_count = len(content.split())
-        logger.info(f"📊 {section}: {word_count} words, {char_count} chars")
+        logger.info("📊 %s: %s words, %s chars", section, word_count, char_count)
         
         # Flag suspiciously short or long sections
         if content == "Not discussed":
-            logger.warning(f"⚠️ {section} section is empty")
+            logger.warning("⚠️ %s section is empty", section)
         elif word_count < 5:
-            logger.warning(f"⚠️ {section} section is very short ({word_count} words)")
+            logger.warning("⚠️ %s section is very short (%s words)", section, word_count)
         elif word_count > 500:
-            logger.warning(f"⚠️ {section} section is very long ({word_count} words)")
+            logger.warning("⚠️ %s section is very long (%s words)", section, word_count)
 
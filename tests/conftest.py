@@ -0,0 +1,64 @@
+import os
+
+# Keep imports from building Azure clients; tests swap in the fakes below
+os.environ.setdefault("AZURE_CLIENT_DISABLED", "1")
+
+import pytest
+
+import database.patient_db as patient_db
+
+
+class FakePager:
+    def __init__(self, pages, continuation):
+        self.continuation = continuation
+        self._pages = iter(pages)
+        self.continuation_token = "next-token" if len(pages) > 1 else None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._pages)
+
+
+class FakeQuery:
+    def __init__(self, container):
+        self._container = container
+
+    def by_page(self, continuation=None):
+        pager = FakePager([list(map(dict, page)) for page in self._container.pages], continuation)
+        self._container.pagers.append(pager)
+        return pager
+
+
+class FakeContainer:
+    """Just enough of a Cosmos container client for patient_db."""
+
+    def __init__(self, pages=(), fail_names=()):
+        self.pages = list(pages)
+        self.fail_names = set(fail_names)
+        self.items = []
+        self.queries = []
+        self.pagers = []
+
+    def create_item(self, body):
+        if body.get('name') in self.fail_names:
+            raise RuntimeError("write failed")
+        self.items.append(body)
+        return body
+
+    def query_items(self, query, parameters=None, enable_cross_partition_query=False, max_item_count=None):
+        self.queries.append({"query": query, "parameters": parameters, "max_item_count": max_item_count})
+        return FakeQuery(self)
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """Route patient_db at one FakeContainer with reversible 'enc:' encryption."""
+    container = FakeContainer()
+    monkeypatch.setattr(patient_db, "check_db_available", lambda: None)
+    monkeypatch.setattr(patient_db, "get_container", lambda name: container)
+    monkeypatch.setattr(patient_db, "encrypt_text", lambda text: None if text is None else f"enc:{text}")
+    monkeypatch.setattr(patient_db, "decrypt_text_many",
+                        lambda values: [None if v is None else v[len("enc:"):] for v in values])
+    return container
@@ -0,0 +1,98 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+from auth.middleware import get_current_user
+from database.patient_db import MAX_PAGE_SIZE, SOAP_SUMMARY_FIELDS
+
+
+@pytest.fixture
+def client(monkeypatch):
+    app_module.app.dependency_overrides[get_current_user] = lambda: {"email": "doc@example.com", "name": "Doc"}
+    monkeypatch.setattr(app_module, "get_logged_user_by_google", lambda email: {"id": "user-1"})
+    yield TestClient(app_module.app)
+    app_module.app.dependency_overrides.clear()
+
+
+def test_bulk_create_without_wait_returns_202_and_writes_in_background(client, monkeypatch):
+    writes = []
+    monkeypatch.setattr(app_module, "write_patients_bulk",
+                        lambda planned, user_id: writes.append((planned, user_id)) or ([], []))
+
+    response = client.post("/patients/bulk?wait=false",
+                           json={"patients": [{"name": "Ann"}, {"name": ""}]})
+
+    assert response.status_code == 202
+    body = response.json()
+    assert body["status"] == "accepted"
+    assert [row["index"] for row in body["patients"]] == [0]
+    assert body["errors"] == [{"index": 1, "error": "Patient name is required."}]
+    # TestClient runs background tasks before returning
+    assert len(writes) == 1
+    planned, user_id = writes[0]
+    assert user_id == "user-1"
+    assert [row["patient_id"] for row in planned] == [row["id"] for row in body["patients"]]
+
+
+@pytest.mark.parametrize("page_size", [0, -1, MAX_PAGE_SIZE + 1])
+def test_patients_rejects_out_of_range_page_size(client, monkeypatch, page_size):
+    monkeypatch.setattr(app_module, "get_patients_page", lambda **kwargs: pytest.fail("should not query"))
+
+    response = client.get(f"/patients?page_size={page_size}")
+
+    assert response.status_code == 422
+
+
+def test_patients_passes_page_size_and_continuation_through(client, monkeypatch):
+    calls = []
+
+    def fake_page(**kwargs):
+        calls.append(kwargs)
+        return [{"id": 11, "name": "Ann"}], "next-token"
+
+    monkeypatch.setattr(app_module, "get_patients_page", fake_page)
+
+    response = client.get("/patients?page_size=20&continuation=token-1")
+
+    assert response.status_code == 200
+    assert calls == [{"user_id": "user-1", "continuation": "token-1", "page_size": 20}]
+    assert response.json()["continuation"] == "next-token"
+
+
+def test_patients_continuation_alone_lets_cosmos_choose_page_size(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(app_module, "get_patients_page",
+                        lambda **kwargs: calls.append(kwargs) or ([], None))
+
+    response = client.get("/patients?continuation=token-1")
+
+    assert response.status_code == 200
+    assert calls[0]["page_size"] is None
+
+
+@pytest.mark.parametrize("page_size", [0, MAX_PAGE_SIZE + 1])
+def test_soap_records_rejects_out_of_range_page_size(client, page_size):
+    response = client.get(f"/patient/11/soap_records?page_size={page_size}")
+
+    assert response.status_code == 422
+
+
+def test_soap_records_summary_page_omits_note_bodies(client, monkeypatch):
+    calls = []
+
+    def fake_page(patient_id, continuation=None, page_size=None, fields=None):
+        calls.append((patient_id, continuation, page_size, fields))
+        return [{"id": 21, "patient_id": 11, "audio_file_name": "a.wav",
+                 "created_at": "2024-01-01", "updated_at": "2024-01-01"}], None
+
+    monkeypatch.setattr(app_module, "get_patient_by_id", lambda patient_id, user_id: {"id": patient_id})
+    monkeypatch.setattr(app_module, "get_patient_soap_records_page", fake_page)
+    monkeypatch.setattr(app_module, "get_voice_recordings", lambda patient_id, fields=None: [])
+
+    response = client.get("/patient/11/soap_records?summary=true&page_size=5&continuation=token-1")
+
+    assert response.status_code == 200
+    assert calls == [(11, "token-1", 5, SOAP_SUMMARY_FIELDS)]
+    record = response.json()["soap_records"][0]
+    for field in ("transcript", "original_transcript", "soap_sections"):
+        assert field not in record
@@ -0,0 +1,26 @@
+import asyncio
+
+import pipeline.core as core
+from pipeline.core import MedicalAudioProcessor
+
+
+def test_process_many_reports_failing_file_without_dropping_others(monkeypatch):
+    processor = MedicalAudioProcessor()
+
+    def fake_transcribe(audio_path, beam_size=5):
+        if audio_path == "bad.wav":
+            raise RuntimeError("Deepgram unavailable")
+        return "Doctor: How are you? Patient: Fine.", []
+
+    async def fake_generate_soap(transcript):
+        return {"Subjective": "Fine", "Objective": "", "Assessment": "", "Plan": ""}
+
+    monkeypatch.setattr(processor, "transcribe_file", fake_transcribe)
+    monkeypatch.setattr(core, "generate_soap_async", fake_generate_soap)
+
+    results = asyncio.run(processor.process_many(["good.wav", "bad.wav", "other.wav"]))
+
+    assert [r["audio_path"] for r in results] == ["good.wav", "bad.wav", "other.wav"]
+    assert results[1] == {"audio_path": "bad.wav", "error": "Deepgram unavailable"}
+    assert results[0]["soap_sections"]["Subjective"] == "Fine"
+    assert "error" not in results[2]
@@ -0,0 +1,39 @@
+import pipeline.gemini_llm as gemini_llm
+from pipeline.gemini_llm import _likely_needs_correction, _prepare_diarization
+
+TRIVIAL = "Doctor: Good morning. Patient: Good morning."
+
+
+def test_trivial_transcript_does_not_need_correction():
+    assert not _likely_needs_correction(TRIVIAL)
+
+
+def test_question_answer_boundary_needs_correction():
+    # A short acknowledgment after a question may sit on the wrong side
+    assert _likely_needs_correction("Doctor: Does it hurt? Patient: Yes.")
+
+
+def test_turn_ending_mid_sentence_needs_correction():
+    assert _likely_needs_correction("Doctor: Please sit down. I've Patient: been having chest pain.")
+
+
+def test_repeated_speaker_needs_correction():
+    assert _likely_needs_correction("Doctor: Hello. Doctor: Please sit down. Patient: Thanks.")
+
+
+def test_long_transcript_needs_correction():
+    transcript = " ".join(
+        f"{'Doctor' if i % 2 == 0 else 'Patient'}: Sentence {i}." for i in range(6)
+    )
+    assert _likely_needs_correction(transcript)
+
+
+def test_clean_transcript_is_corrected_when_skip_flag_is_off(monkeypatch):
+    monkeypatch.setattr(gemini_llm, "SKIP_CLEAN_TRANSCRIPT_CORRECTION", False)
+    assert _prepare_diarization(TRIVIAL) is not None
+
+
+def test_clean_transcript_is_skipped_when_skip_flag_is_on(monkeypatch):
+    monkeypatch.setattr(gemini_llm, "SKIP_CLEAN_TRANSCRIPT_CORRECTION", True)
+    assert _prepare_diarization(TRIVIAL) is None
+    assert _prepare_diarization("Doctor: Does it hurt? Patient: Yes.") is not None
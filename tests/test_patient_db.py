@@ -0,0 +1,129 @@
+import pytest
+
+from database.patient_db import (
+    MAX_BULK_PATIENTS,
+    MAX_PAGE_SIZE,
+    SOAP_SUMMARY_FIELDS,
+    create_patients_bulk,
+    get_patient_soap_records_page,
+    get_patients_page,
+    plan_patients_bulk,
+    write_patients_bulk,
+)
+
+
+def test_plan_patients_bulk_assigns_ids_and_strips_values():
+    planned, errors = plan_patients_bulk([{"name": "  Ann  ", "phone_number": " 555 "}])
+
+    assert errors == []
+    assert len(planned) == 1
+    row = planned[0]
+    assert row["index"] == 0
+    assert isinstance(row["patient_id"], int)
+    assert (row["name"], row["address"], row["phone_number"], row["problem"]) == ("Ann", "", "555", "")
+
+
+def test_plan_patients_bulk_reports_bad_rows_without_failing_the_batch():
+    planned, errors = plan_patients_bulk([
+        {"name": "Ann"},
+        {"name": "   "},
+        {"name": 42},
+        {"name": "Bob", "phone_number": ["555"]},
+    ])
+
+    assert [row["index"] for row in planned] == [0]
+    assert errors == [
+        {"index": 1, "error": "Patient name is required."},
+        {"index": 2, "error": "Fields must be strings: name."},
+        {"index": 3, "error": "Fields must be strings: phone_number."},
+    ]
+
+
+def test_plan_patients_bulk_rejects_oversized_batches():
+    with pytest.raises(ValueError):
+        plan_patients_bulk([{"name": "Ann"}] * (MAX_BULK_PATIENTS + 1))
+
+
+def test_write_patients_bulk_encrypts_and_isolates_failures(fake_db):
+    fake_db.fail_names = {"enc:Bob"}
+    planned, _ = plan_patients_bulk([{"name": "Ann", "problem": "Cough"}, {"name": "Bob"}])
+
+    created, errors = write_patients_bulk(planned, user_id="user-1")
+
+    assert [patient["name"] for patient in created] == ["Ann"]
+    assert created[0]["problem"] == "Cough"
+    assert errors == [{"index": 1, "error": "write failed"}]
+    stored = fake_db.items[0]
+    assert stored["name"] == "enc:Ann"
+    assert stored["user_id"] == "user-1"
+    assert stored["id"] == str(planned[0]["patient_id"])
+
+
+def test_write_patients_bulk_requires_user_id(fake_db):
+    with pytest.raises(ValueError):
+        write_patients_bulk([], user_id="")
+
+
+def test_create_patients_bulk_merges_errors_in_row_order(fake_db):
+    fake_db.fail_names = {"enc:Cid"}
+
+    created, errors = create_patients_bulk([{"name": "Cid"}, {"name": 7}, {"name": "Ann"}], user_id="user-1")
+
+    assert [patient["name"] for patient in created] == ["Ann"]
+    assert [error["index"] for error in errors] == [0, 1]
+
+
+PATIENT_DOC = {"id": "11", "patient_id": 11, "user_id": "user-1", "name": "enc:Ann",
+               "address": None, "phone_number": "enc:555", "problem": None, "created_at": "2024-01-01"}
+
+
+def test_get_patients_page_passes_page_size_and_continuation(fake_db):
+    fake_db.pages = [[PATIENT_DOC], [PATIENT_DOC]]
+
+    patients, continuation = get_patients_page("user-1", continuation="token-1", page_size=25)
+
+    assert fake_db.queries[0]["max_item_count"] == 25
+    assert fake_db.pagers[0].continuation == "token-1"
+    assert continuation == "next-token"
+    assert patients[0]["name"] == "Ann"
+    assert patients[0]["address"] == ""
+    assert patients[0]["id"] == 11
+
+
+def test_get_patients_page_lets_cosmos_choose_when_page_size_is_omitted(fake_db):
+    fake_db.pages = [[PATIENT_DOC]]
+
+    _, continuation = get_patients_page("user-1")
+
+    assert fake_db.queries[0]["max_item_count"] == -1
+    assert fake_db.pagers[0].continuation is None
+    assert continuation is None
+
+
+@pytest.mark.parametrize("page_size", [0, -5, MAX_PAGE_SIZE + 1])
+def test_get_patients_page_rejects_out_of_range_page_size(fake_db, page_size):
+    with pytest.raises(Exception, match="page_size"):
+        get_patients_page("user-1", page_size=page_size)
+    assert fake_db.queries == []
+
+
+def test_projected_patient_rows_omit_unselected_fields(fake_db):
+    fake_db.pages = [[{"id": "11", "patient_id": 11, "name": "enc:Ann"}]]
+
+    patients, _ = get_patients_page("user-1", page_size=10, fields=("id", "patient_id", "name"))
+
+    assert patients == [{"id": 11, "patient_id": 11, "name": "Ann"}]
+
+
+def test_soap_summary_page_omits_decrypted_fields(fake_db):
+    fake_db.pages = [[{"id": "21", "record_id": 21, "patient_id": 11, "audio_file_name": "a.wav",
+                       "created_at": "2024-01-01", "updated_at": "2024-01-01"}]]
+
+    records, _ = get_patient_soap_records_page(11, page_size=10, fields=SOAP_SUMMARY_FIELDS)
+
+    query = fake_db.queries[0]["query"]
+    assert "c.transcript" not in query and "c.soap_sections" not in query
+    assert fake_db.queries[0]["parameters"] == [{"name": "@patient_id", "value": 11}]
+    assert records[0]["id"] == 21
+    for field in ("transcript", "original_transcript", "soap_sections"):
+        assert field not in records[0]
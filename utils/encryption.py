@@ -1,17 +1,13 @@
 import os
 import base64
 import json
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import logging
 import hashlib
 import hmac
 
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
-
-from azure.identity import ClientSecretCredential
-from azure.keyvault.secrets import SecretClient
-
 logger = logging.getLogger('backend.encryption')
 
 
@@ -23,6 +19,7 @@ SECRET_NAME_ENV = "SECRET_NAME"
 
 _cached_key: bytes = None
 _key_loaded = False
+_aead: Optional[AESGCM] = None
 
 
 def _load_key_from_keyvault() -> bytes:
@@ -50,6 +47,10 @@ def _load_key_from_keyvault() -> bytes:
     logger.info(f"[KEYVAULT] Connecting to: {vault_url}")
     logger.info(f"[KEYVAULT] Secret name: {secret_name}")
 
+    # Imported here so workers that never encrypt do not load the Azure SDK
+    from azure.identity import ClientSecretCredential
+    from azure.keyvault.secrets import SecretClient
+
     try:
         credential = ClientSecretCredential(
             tenant_id=tenant_id,
@@ -102,43 +103,85 @@ def _get_key() -> bytes:
     return _cached_key
 
 
-def encrypt_bytes(data: bytes) -> str:
-    key = _get_key()
-    aesgcm = AESGCM(key)
+def _get_aead() -> AESGCM:
+    """Return the cached AESGCM cipher, so the key schedule is set up once per process."""
+    global _aead
+
+    if _aead is None:
+        _aead = AESGCM(_get_key())
+    return _aead
+
+
+def encrypt_bytes_raw(data: bytes) -> bytes:
+    """Encrypt to raw nonce || ct || tag bytes, for binary sinks such as Blob Storage."""
+    aesgcm = _get_aead()
     nonce = os.urandom(12)
     ct = aesgcm.encrypt(nonce, data, None)
 
-    digest = hashlib.sha256(data).hexdigest()
-    logger.info(f"Encrypted {len(data)} bytes sha256={digest}")
+    # Hashing is a second full pass over the payload, so only pay for it when debugging
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Encrypted {len(data)} bytes sha256={hashlib.sha256(data, usedforsecurity=False).hexdigest()}")
 
-    return base64.b64encode(nonce + ct).decode()
+    return nonce + ct
 
 
-def decrypt_bytes(b64: str) -> bytes:
-    key = _get_key()
-    raw = base64.b64decode(b64)
+def decrypt_bytes_raw(raw: bytes) -> bytes:
+    """Decrypt raw nonce || ct || tag bytes produced by encrypt_bytes_raw."""
     nonce = raw[:12]
     ct = raw[12:]
 
-    aesgcm = AESGCM(key)
-    data = aesgcm.decrypt(nonce, ct, None)
+    data = _get_aead().decrypt(nonce, ct, None)
 
-    digest = hashlib.sha256(data).hexdigest()
-    logger.info(f"Decrypted {len(data)} bytes sha256={digest}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Decrypted {len(data)} bytes sha256={hashlib.sha256(data, usedforsecurity=False).hexdigest()}")
 
     return data
 
 
+def encrypt_bytes(data: bytes) -> str:
+    return base64.b64encode(encrypt_bytes_raw(data)).decode()
+
+
+def decrypt_bytes(b64: str) -> bytes:
+    return decrypt_bytes_raw(base64.b64decode(b64))
+
+
 def encrypt_text(text: Optional[str]) -> Optional[str]:
     if text is None:
         return None
     return encrypt_bytes(text.encode())
 
 
+def _decrypt_text_raw(b64: str) -> str:
+    raw = base64.b64decode(b64)
+    return _get_aead().decrypt(raw[:12], raw[12:], None).decode()
+
+
 def decrypt_text(b64: Optional[str]) -> Optional[str]:
+    # Never cached: this path also decrypts credentials such as password_hash
     if b64 is None:
         return None
-    return decrypt_bytes(b64).decode()
+    return _decrypt_text_raw(b64)
+
+
+def decrypt_text_many(b64s: List[Optional[str]]) -> List[Optional[str]]:
+    """
+    Decrypt several text values in one pass; None entries stay None.
+    Repeated ciphertexts within the batch are decrypted once. The memo lives only
+    for this call, so no plaintext outlives the batch that asked for it.
+    """
+    seen: Dict[str, str] = {}
+    out = []
+    append = out.append
+    for b64 in b64s:
+        if b64 is None:
+            append(None)
+            continue
+        plaintext = seen.get(b64)
+        if plaintext is None:
+            plaintext = seen[b64] = _decrypt_text_raw(b64)
+        append(plaintext)
+    return out
 
 
 def encrypt_json(obj: Optional[Dict[str, Any]]) -> Optional[str]:
@@ -0,0 +1,30 @@
+import os
+import logging
+
+from dotenv import load_dotenv
+
+logger = logging.getLogger('backend.env')
+
+_env_loaded = False
+
+
+def load_env() -> None:
+    """Load variables from .env into os.environ once per process.
+
+    Every module that reads configuration calls this at import; only the first
+    call actually parses the file, the rest are no-ops. Outside development
+    (ENV set to anything else) the platform injects the environment, so the
+    file is not read at all.
+    """
+    global _env_loaded
+
+    if _env_loaded:
+        return
+
+    _env_loaded = True
+    if os.getenv('ENV', 'development') != 'development':
+        logger.debug("[ENV] Skipping .env (ENV=%s)", os.getenv('ENV'))
+        return
+
+    load_dotenv()
+    logger.debug("[ENV] .env loaded")